@@ -1,12 +1,42 @@
-from flask import Flask, request, jsonify
-from modules.deepseek_runner import run_deepseek
+from flask import Flask, Response, request, jsonify, stream_with_context
+import json
+import os
+import sys
+
+# The modules import each other by bare name
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules"))
+from modules.deepseek_runner import run_deepseek, stream_deepseek
 from modules.deepseek_filemanager import read_prompt_file
 from modules.smart_result_handler import format_results
 from modules.deepseek_writer import write_output
 from modules.gaurdian import run_safety_checks
-import os
+from modules.job_runner import JobManager, DEFAULT_MODEL
 
 app = Flask(__name__)
+jobs = JobManager()
+
+OUTPUT_FILE_PATH = "output/deepseek_output.txt"
+
+
+def process_karx(input_file, permissions, model=DEFAULT_MODEL, use_cache=True):
+    # ✅ 1. Run safety check (guardian)
+    run_safety_checks(permissions)
+
+    # ✅ 2. Read input
+    input_text = read_prompt_file(input_file)
+
+    # ✅ 3. Process with main AI logic (waits for a free slot of this model)
+    with jobs.slot(model):
+        result = run_deepseek(input_text, model=model, use_cache=use_cache)
+
+    # ✅ 4. Format output
+    formatted_result = format_results(result)
+
+    # ✅ 5. Write to file
+    write_output(OUTPUT_FILE_PATH, formatted_result)
+    print("output",write_output)
+
+    return formatted_result
 
 @app.route('/run_karx', methods=['POST'])
 def run_karx():
@@ -14,28 +44,70 @@ def run_karx():
         data = request.json
         input_file = data.get('input_file', 'Prompts/new_idea.txt')  # default file
         permissions = data.get('permissions', '')
+        model = jobs.check_model(data.get('model', DEFAULT_MODEL))
+        use_cache = not data.get('no_cache', False)
 
-        # ✅ 1. Run safety check (guardian)
-        run_safety_checks(permissions)
-
-        # ✅ 2. Read input
-        input_text = read_prompt_file(input_file)
+        # Job mode: queue the work and hand back an id to poll
+        if data.get('async'):
+            job = jobs.submit(process_karx, input_file, permissions, model, use_cache, model=model)
+            return jsonify({"status": "queued", "job_id": job.id}), 202
 
-        # ✅ 3. Process with main AI logic
-        result = run_deepseek(input_text)
+        formatted_result = process_karx(input_file, permissions, model, use_cache)
+        return jsonify({"status": "success", "result": formatted_result})
 
-        # ✅ 4. Format output
-        formatted_result = format_results(result)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
 
-        # ✅ 5. Write to file
-        output_file_path = "output/deepseek_output.txt"
-        write_output(output_file_path, formatted_result)
-        print("output",write_output)
+def sse_event(data, event=None):
+    lines = f"event: {event}\n" if event else ""
+    return lines + f"data: {json.dumps(data)}\n\n"
 
-        return jsonify({"status": "success", "result": formatted_result})
+@app.route('/run_karx/stream', methods=['POST'])
+def run_karx_stream():
+    """Same pipeline as /run_karx, but forwards tokens as server-sent events while they generate."""
+    try:
+        data = request.json
+        input_file = data.get('input_file', 'Prompts/new_idea.txt')
+        permissions = data.get('permissions', '')
+        model = jobs.check_model(data.get('model', DEFAULT_MODEL))
+        use_cache = not data.get('no_cache', False)
 
+        # Checks run before the stream opens so failures still get a plain error response
+        run_safety_checks(permissions)
+        input_text = read_prompt_file(input_file)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+    def generate():
+        tokens = []
+        try:
+            # Same generation call and per-model limit as /run_karx
+            with jobs.slot(model):
+                for token in stream_deepseek(input_text, model=model, use_cache=use_cache):
+                    tokens.append(token)
+                    yield sse_event({"token": token})
+
+            formatted_result = format_results("".join(tokens))
+            write_output(OUTPUT_FILE_PATH, formatted_result)
+            yield sse_event({"status": "success", "result": formatted_result}, event="done")
+        except Exception as e:
+            yield sse_event({"status": "error", "message": str(e)}, event="error")
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=headers)
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    # ?wait=N long-polls for up to N seconds instead of returning right away
+    wait = request.args.get('wait', type=float)
+    job = jobs.wait(job_id, timeout=wait) if wait else jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Unknown job: {job_id}"}), 404
+    return jsonify(job.to_dict())
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=True, threaded=True)
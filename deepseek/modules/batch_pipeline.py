@@ -0,0 +1,109 @@
+# batch_pipeline.py
+
+import time
+import queue
+import threading
+
+QUEUE_SIZE = 32  # items buffered between two stages
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a pipeline. `func` takes an item and returns the item for
+    the next stage (or None to drop it). `workers` threads run it in parallel.
+    """
+
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _record(self, seconds):
+        with self._lock:
+            self.processed += 1
+            self.busy_seconds += seconds
+
+
+class Pipeline:
+    """
+    Runs items through stages connected by bounded queues, so e.g. model
+    generation for file N overlaps linting of file N-1 instead of the two
+    adding up. Failures are collected per item and don't stop the batch.
+    """
+
+    def __init__(self, stages, queue_size=QUEUE_SIZE):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.errors = []
+        self.results = []
+        self._lock = threading.Lock()
+
+    def _worker(self, stage, inbox, outbox):
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                with self._lock:
+                    self.errors.append({"stage": stage.name, "item": item, "error": str(e)})
+                print(f"❌ {stage.name} failed: {e}")
+                result = None
+            stage._record(time.perf_counter() - start)
+            if result is not None:
+                outbox.put(result)
+
+    def run(self, items):
+        """Feeds `items` through every stage and returns a timing report once all are done."""
+        start = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        groups = []
+        for index, stage in enumerate(self.stages):
+            threads = [
+                threading.Thread(target=self._worker, args=(stage, queues[index], queues[index + 1]),
+                                 name=f"{stage.name}-{i}", daemon=True)
+                for i in range(stage.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            groups.append(threads)
+
+        collector = threading.Thread(target=self._collect, args=(queues[-1],), daemon=True)
+        collector.start()
+
+        for item in items:
+            queues[0].put(item)
+
+        # Shut stages down in order: once every worker of a stage has exited,
+        # nothing more can reach the next queue.
+        for index, threads in enumerate(groups):
+            for _ in threads:
+                queues[index].put(_DONE)
+            for thread in threads:
+                thread.join()
+        queues[-1].put(_DONE)
+        collector.join()
+
+        return {
+            "seconds": round(time.perf_counter() - start, 3),
+            "completed": len(self.results),
+            "failed": len(self.errors),
+            "stages": {
+                stage.name: {"processed": stage.processed, "busy_seconds": round(stage.busy_seconds, 3),
+                             "workers": stage.workers}
+                for stage in self.stages
+            },
+        }
+
+    def _collect(self, inbox):
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            self.results.append(item)
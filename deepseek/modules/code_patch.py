@@ -0,0 +1,192 @@
+# code_patch.py
+
+import re
+import ast
+import textwrap
+from memory.context_selector import tokenize
+from memory.symbol_index import current_entry, iter_symbols
+
+MAX_SHARE = 0.6  # if the selected symbols are more than this share of the file, send it whole
+_FENCE = re.compile(r"```[\w+-]*\n(.*?)```", re.S)
+
+
+def _start(node):
+    return min([d.lineno for d in node.decorator_list] + [node.lineno])
+
+
+def _is_def(node):
+    return isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip())
+
+
+def _editable_symbols(entry):
+    """
+    {qualname: symbol} for the top-level functions and classes of a memory
+    entry and the methods directly inside those classes; spans are 1-based,
+    inclusive and include decorators.
+    """
+    spans = {}
+    for symbol in iter_symbols(entry):
+        qualname, kind = symbol["qualname"], symbol["kind"]
+        if ("." not in qualname and kind != "method") or (qualname.count(".") == 1 and kind == "method"):
+            spans[qualname] = symbol
+    return spans
+
+
+def select_symbols(code, instruction, entry=None):
+    """
+    Picks the functions, methods or classes the instruction is about by
+    matching its words against symbol names. Returns [qualname] or None
+    when the update should see the whole file. `entry` is the file's
+    memory entry; its spans are used while they still match `code`.
+    """
+    spans = _editable_symbols(current_entry(code, entry))
+    words = set(tokenize(instruction))
+    scores = {}
+    for qualname in spans:
+        name_words = tokenize(qualname.rsplit(".", 1)[-1])
+        if name_words:
+            score = len(words.intersection(name_words)) / len(name_words)
+            if score >= 0.5:
+                scores[qualname] = score
+
+    # A class is sent whole only when none of its methods matched by name
+    selected = [q for q in scores if not any(other.startswith(q + ".") for other in scores)]
+    # and then its methods don't need sending twice
+    selected = [q for q in selected if "." not in q or q.split(".")[0] not in selected]
+    if not selected:
+        return None
+
+    sent_lines = sum(spans[q]["end"] - spans[q]["start"] + 1 for q in selected)
+    if sent_lines > MAX_SHARE * len(code.splitlines()):
+        return None
+    return sorted(selected, key=lambda q: spans[q]["start"])
+
+
+def outline(code, entry=None):
+    """One line per import and symbol signature, for context around the symbols sent."""
+    entry = current_entry(code, entry)
+    result = list(entry.get("imports", []))
+    for qualname, symbol in _editable_symbols(entry).items():
+        indent = "    " if "." in qualname else ""
+        result.append(indent + symbol["signature"] + ":")
+    return "\n".join(result)
+
+
+def symbol_sources(code, qualnames, entry=None):
+    """Source of each selected symbol, read by its span; methods shown inside their class header."""
+    lines = code.splitlines()
+    spans = _editable_symbols(current_entry(code, entry))
+    blocks = []
+    for qualname in qualnames:
+        symbol = spans[qualname]
+        source = "\n".join(lines[symbol["start"] - 1:symbol["end"]])
+        if "." in qualname:
+            source = spans[qualname.split(".")[0]]["signature"] + ":\n" + source
+        blocks.append(source)
+    return "\n\n".join(blocks)
+
+
+def _reply_code(reply):
+    blocks = _FENCE.findall(reply)
+    return "\n".join(blocks) if blocks else reply
+
+
+def _reindent(source, column):
+    return textwrap.indent(textwrap.dedent(source), " " * column)
+
+
+def _body_indent(lines, symbol):
+    """Column of the first statement inside a class, from its span."""
+    body = lines[symbol["start"] - 1:symbol["end"]]
+    header = next(i for i, line in enumerate(body) if line.lstrip().startswith("class "))
+    inner = next((line for line in body[header + 1:] if line.strip()), None)
+    return _indent(inner) if inner else _indent(body[header]) + 4
+
+
+def apply_symbol_updates(code, reply, qualnames, entry=None):
+    """
+    Splices the definitions in a model reply into `code`: definitions whose
+    name matches a sent symbol replace it, methods inside a class header
+    replace or extend that class, other definitions are added before the
+    `if __name__ == "__main__":` block (or at the end), and missing imports
+    are added after the existing ones.
+
+    Returns the new code, or raises ValueError if the reply or the result
+    doesn't parse.
+    """
+    new_source = _reply_code(reply)
+    try:
+        new_tree = ast.parse(new_source)
+    except SyntaxError as e:
+        raise ValueError(f"reply is not valid Python: {e}")
+    new_lines = new_source.splitlines()
+
+    lines = code.splitlines()
+    tree = ast.parse(code)
+    spans = _editable_symbols(current_entry(code, entry))
+    edits = []  # (first line, last line, replacement text); last < first means insert
+    appended = []
+
+    def segment(node):
+        return "\n".join(new_lines[_start(node) - 1:node.end_lineno])
+
+    for node in new_tree.body:
+        if not _is_def(node):
+            continue
+        name = node.name
+        methods = [q for q in qualnames if q.startswith(name + ".")]
+        if isinstance(node, ast.ClassDef) and methods and name not in qualnames:
+            owner = spans[name]
+            for child in node.body:
+                if not _is_def(child):
+                    continue
+                qualname = f"{name}.{child.name}"
+                if qualname in spans:
+                    start, end = spans[qualname]["start"], spans[qualname]["end"]
+                    edits.append((start, end, _reindent(segment(child), _indent(lines[start - 1]))))
+                else:
+                    end = owner["end"]
+                    edits.append((end + 1, end, "\n" + _reindent(segment(child), _body_indent(lines, owner))))
+        elif name in spans:
+            edits.append((spans[name]["start"], spans[name]["end"], segment(node)))
+        elif sum(q.endswith("." + name) for q in qualnames) == 1:
+            # A sent method returned without its class header
+            old = spans[next(q for q in qualnames if q.endswith("." + name))]
+            start, end = old["start"], old["end"]
+            edits.append((start, end, _reindent(segment(node), _indent(lines[start - 1]))))
+        else:
+            appended.append(segment(node))
+
+    existing_imports = {ast.dump(n) for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))}
+    new_imports = [
+        "\n".join(new_lines[n.lineno - 1:n.end_lineno])
+        for n in new_tree.body
+        if isinstance(n, (ast.Import, ast.ImportFrom)) and ast.dump(n) not in existing_imports
+    ]
+    if new_imports:
+        last_import = max((n.end_lineno for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))),
+                          default=0)
+        edits.append((last_import + 1, last_import, "\n".join(new_imports)))
+
+    if appended:
+        main_guard = next((n for n in tree.body if isinstance(n, ast.If) and "__main__" in ast.dump(n.test)), None)
+        at = main_guard.lineno if main_guard else len(lines) + 1
+        lead = "" if main_guard else "\n\n"
+        edits.append((at, at - 1, lead + "\n\n\n".join(appended) + "\n\n"))
+
+    if not edits:
+        raise ValueError("reply contains no definitions to apply")
+
+    for start, end, text in sorted(edits, key=lambda e: (e[0], e[1]), reverse=True):
+        lines[start - 1:end] = text.split("\n")
+    updated = "\n".join(lines) + "\n"
+
+    try:
+        ast.parse(updated)
+    except SyntaxError as e:
+        raise ValueError(f"patched file is not valid Python: {e}")
+    return updated
@@ -2,40 +2,33 @@ from pathlib import Path
 
 PROMPT_FILE = "../Prompts/new_idea.txt"
 MEMORY_FILE = "../memory/deepseek_output.txt"
-import os
 import json
-import requests
-
-def update_file_with_deepseek(update_prompt, filepath, memory_path="deepseek/memory/code_memory.json"):
+from ollama_client import get_client, strip_code_fences
+from memory.memory_store import get_store, canonical_key
+from memory.context_selector import select_context
+from memory.symbol_index import extract_symbols
+from code_patch import select_symbols, outline, symbol_sources, apply_symbol_updates
+from file_writer import write_text
+
+def update_file_with_deepseek(update_prompt, filepath, memory_path="deepseek/memory/code_memory.json", partial=True):
     """
     Updates an existing Python file using DeepSeek based on a new prompt.
     Only the relevant parts of the code should change.
+
+    With `partial`, only the functions/classes the prompt names are sent
+    (plus an outline of the rest) and the definitions that come back are
+    spliced into the file; it falls back to sending the whole file when
+    nothing matches or the reply can't be applied.
     """
 
     def load_memory():
-        if not os.path.exists(memory_path):
-            return {}
-        with open(memory_path, "r") as f:
-            return json.load(f)
+        return get_store(memory_path)
 
     def save_memory(memory):
-        with open(memory_path, "w") as f:
-            json.dump(memory, f, indent=4)
-
-    def extract_structure(code):
-        classes, functions, imports = [], [], []
-        for line in code.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("class "):
-                classes.append(stripped.split()[1].split("(")[0])
-            elif stripped.startswith("def "):
-                functions.append(stripped.split()[1].split("(")[0])
-            elif stripped.startswith("import ") or stripped.startswith("from "):
-                imports.append(stripped)
-        return classes, functions, imports
+        memory.save()
 
     def build_update_prompt(update_prompt, memory, existing_code):
-        memory_summary = json.dumps(memory, indent=2)
+        memory_summary = json.dumps(select_context(memory, update_prompt, target=filepath), indent=2)
         return f"""You are an expert code editor AI.
 
 You will receive an existing Python file and a task.
@@ -49,49 +42,72 @@ ONLY modify what's necessary. Do not rewrite the whole code unless absolutely ne
 Existing code:
 {existing_code}
 
+Current memory:
+{memory_summary}
+"""
+
+    def build_partial_prompt(update_prompt, memory, existing_code, symbols, entry):
+        memory_summary = json.dumps(select_context(memory, update_prompt, target=filepath), indent=2)
+        return f"""You are an expert code editor AI.
+
+You will receive part of an existing Python file and a task.
+Your job is to update that part according to the instruction.
+
+Instruction:
+"{update_prompt}"
+
+Return ONLY the complete new versions of the functions or classes you change,
+and any new ones you add, plus any new import lines, in one Python code block.
+Keep methods inside their class header. Do not return code you did not change.
+
+Outline of the whole file:
+{outline(existing_code, entry)}
+
+Code to update:
+{symbol_sources(existing_code, symbols, entry)}
+
 Current memory:
 {memory_summary}
 """
 
     def query_deepseek(prompt, model="deepseek-coder"):
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": model, "prompt": prompt, "stream": True}
-        )
-        code = ""
-        for line in response.iter_lines():
-            if line:
-                code += line.decode("utf-8")
-        return code
+        return get_client().generate(prompt, model=model)
 
     def read_file(filepath):
         with open(filepath, "r", encoding="utf-8") as f:
             return f.read()
 
     def write_file(code, filepath):
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(code)
-        return extract_structure(code)
+        if not write_text(filepath, code):
+            print(f"⏭️ No changes to write: {filepath}")
+        return extract_symbols(code)
 
     # Begin updating...
     memory = load_memory()
     existing_code = read_file(filepath)
-    prompt = build_update_prompt(update_prompt, memory, existing_code)
-    updated_code = query_deepseek(prompt)
-
-    classes, functions, imports = write_file(updated_code, filepath)
-
-    # Update memory
-    normalized_path = os.path.normpath(filepath)
-    memory[normalized_path] = {
-        "classes": classes,
-        "functions": functions,
-        "imports": imports
-    }
+    updated_code = None
+    # Symbol spans come from the file's memory entry (re-extracted if it is out of date)
+    stored_entry = memory.get(canonical_key(filepath))
+    symbols = select_symbols(existing_code, update_prompt, stored_entry) if partial else None
+    if symbols:
+        reply = query_deepseek(build_partial_prompt(update_prompt, memory, existing_code, symbols, stored_entry))
+        try:
+            updated_code = apply_symbol_updates(existing_code, reply, symbols, stored_entry)
+            print(f"✂️ Updated only: {', '.join(symbols)}")
+        except ValueError as e:
+            print(f"⚠️ Partial update failed ({e}), sending the whole file")
+    if updated_code is None:
+        prompt = build_update_prompt(update_prompt, memory, existing_code)
+        updated_code = strip_code_fences(query_deepseek(prompt))
+
+    # Update memory (only this file is re-parsed)
+    entry = write_file(updated_code, filepath)
+    normalized_path = canonical_key(filepath)
+    memory[normalized_path] = entry
     save_memory(memory)
 
     print(f"🔁 File updated: {filepath}")
-    print(f"🧠 Memory refreshed with → Classes: {classes}, Functions: {functions}")
+    print(f"🧠 Memory refreshed with → Classes: {entry.get('classes')}, Functions: {entry.get('functions')}")
 
 
 def read_prompt_file():
@@ -1,12 +1,17 @@
 import os
 import json
-import requests
-import time
 from pathlib import Path
 import sys
 import os
 
 from error import error_handler
+from ollama_client import get_client
+from memory.memory_store import get_store, canonical_key
+from memory.context_selector import select_context
+from memory.symbol_index import extract_symbols
+from prompt_watcher import PromptWatcher
+from deeepseek_updater import update_file_with_deepseek
+from file_writer import write_text
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 def handle_update_prompt_from_file(self, update_txt_path):
@@ -52,41 +57,16 @@ class DeepSeekController:
         self.memory = self.load_memory()
 
     def load_memory(self):
-        if not os.path.exists(self.memory_path):
-            os.makedirs(os.path.dirname(self.memory_path), exist_ok=True)
-            return {}
-        with open(self.memory_path, "r") as f:
-            return json.load(f)
+        return get_store(self.memory_path)
 
     def save_memory(self):
-        with open(self.memory_path, "w") as f:
-            json.dump(self.memory, f, indent=4)
-
-    def extract_structure(self, code):
-        classes, functions, imports = [], [], []
-        for line in code.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("class "):
-                classes.append(stripped.split()[1].split("(")[0])
-            elif stripped.startswith("def "):
-                functions.append(stripped.split()[1].split("(")[0])
-            elif stripped.startswith("import ") or stripped.startswith("from "):
-                imports.append(stripped)
-        return classes, functions, imports
+        self.memory.save()
 
     def query_deepseek(self, prompt, model="deepseek-coder"):
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": model, "prompt": prompt, "stream": True}
-        )
-        code = ""
-        for line in response.iter_lines():
-            if line:
-                code += json.loads(line.decode("utf-8"))["response"]
-        return code
-
-    def build_writer_prompt(self, user_prompt):
-        memory_summary = json.dumps(self.memory, indent=2)
+        return get_client().generate(prompt, model=model)
+
+    def build_writer_prompt(self, user_prompt, filepath=None):
+        memory_summary = json.dumps(select_context(self.memory, user_prompt, target=filepath), indent=2)
         return f"""You are a helpful AI developer assistant.
 
 You need to generate a Python file based on the following user instruction:
@@ -104,41 +84,32 @@ Memory summary:
 """
 
     def write_code_file(self, code, filepath):
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(code.strip())
-        return self.extract_structure(code)
+        if not write_text(filepath, code.strip()):
+            print(f"⏭️ Unchanged: {filepath}")
+        return extract_symbols(code)
 
     def generate_file(self, user_prompt, filepath):
-        prompt = self.build_writer_prompt(user_prompt)
+        prompt = self.build_writer_prompt(user_prompt, filepath)
         code = self.query_deepseek(prompt)
-        classes, functions, imports = self.write_code_file(code, filepath)
-
-        normalized_path = os.path.normpath(filepath)
-        self.memory[normalized_path] = {
-            "classes": classes,
-            "functions": functions,
-            "imports": imports
-        }
+        entry = self.write_code_file(code, filepath)
+
+        normalized_path = canonical_key(filepath)
+        self.memory[normalized_path] = entry
         self.save_memory()
         print(f"✅ File generated: {filepath}")
-        print(f"🧠 Memory updated with → Classes: {classes}, Functions: {functions}")
+        print(f"🧠 Memory updated with → Classes: {entry.get('classes')}, Functions: {entry.get('functions')}")
 
-    def watch_prompt_folder(self, prompt_folder="Prompts", output_folder="deepseek/generated", poll_interval=3):
-        prompt_dir = Path(prompt_folder)
-        processed_dir = prompt_dir / "processed"
-        os.makedirs(processed_dir, exist_ok=True)
+    def update_file(self, update_instruction, filepath):
+        update_file_with_deepseek(update_instruction, filepath, memory_path=self.memory_path)
 
-        print("👀 Watching prompt folder... Drop `.txt` files into 'Prompts/'")
+    def watch_prompt_folder(self, prompt_folder="Prompts", output_folder="deepseek/generated", poll_interval=3, workers=4):
+        def handle(prompt_path):
+            with open(prompt_path, "r", encoding="utf-8") as f:
+                prompt = f.read().strip()
 
-        while True:
-            for file in prompt_dir.glob("*.txt"):
-                with open(file, "r", encoding="utf-8") as f:
-                    prompt = f.read().strip()
+            filename = f"{Path(prompt_path).stem}.py"
+            filepath = os.path.join(output_folder, filename)
+            self.generate_file(prompt, filepath)
 
-                filename = f"{file.stem}.py"
-                filepath = os.path.join(output_folder, filename)
-                self.generate_file(prompt, filepath)
-
-                file.rename(processed_dir / file.name)
-            time.sleep(poll_interval)
+        print("👀 Watching prompt folder... Drop `.txt` files into 'Prompts/'")
+        PromptWatcher(prompt_folder, handle, workers=workers, poll_interval=poll_interval).run_forever()
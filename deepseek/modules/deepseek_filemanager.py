@@ -1,67 +1,137 @@
 import os
+import sys
 import shutil
+import fnmatch
 from pathlib import Path
-import json
+from memory.memory_store import get_store, canonical_key
 
 MEMORY_PATH = Path("deepseek/memory/code_memory.json")
+# Names (or relative paths) skipped while walking; a trailing "/" only matches folders
+IGNORE_PATTERNS = [".git/", "__pycache__/", "processed/", ".venv/", "venv/", "node_modules/", "*.pyc"]
+
+
+def read_prompt_file(path):
+    """Returns the prompt stored in a text file; raises if it is missing or empty."""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read().strip()
+    if not content:
+        raise ValueError(f"Prompt file is empty: {path}")
+    return content
+
 
 class FileManager:
-    def __init__(self, base_dir="."):
+    def __init__(self, base_dir=".", ignore=IGNORE_PATTERNS):
         self.base_dir = Path(base_dir).resolve()
+        self.ignore = list(ignore)
         self.memory = self.load_memory()
 
     def load_memory(self):
-        if not MEMORY_PATH.exists():
-            return {}
-        with open(MEMORY_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return get_store(MEMORY_PATH)
 
     def save_memory(self):
-        with open(MEMORY_PATH, "w", encoding="utf-8") as f:
-            json.dump(self.memory, f, indent=4)
-
-    def list_files(self):
-        print("📁 Project files:")
-        for path in self.base_dir.rglob("*"):
-            if path.is_file():
-                print(" -", path.relative_to(self.base_dir))
+        self.memory.save()
+
+    def _ignored(self, name, rel_path, is_dir):
+        for pattern in self.ignore:
+            if pattern.endswith("/"):
+                if not is_dir:
+                    continue
+                pattern = pattern[:-1]
+            if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_path, pattern):
+                return True
+        return False
+
+    def iter_files(self, subdir=""):
+        """
+        Yields file paths relative to base_dir, walking with os.scandir so
+        file/folder checks come from the directory listing instead of a
+        stat per entry. Ignored folders are never entered.
+        """
+        stack = [(self.base_dir / subdir, subdir)]
+        while stack:
+            directory, rel_dir = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except (FileNotFoundError, NotADirectoryError, PermissionError):
+                continue
+            with entries:
+                for entry in entries:
+                    rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if self._ignored(entry.name, rel_path, is_dir):
+                        continue
+                    if is_dir:
+                        stack.append((entry.path, rel_path))
+                    elif entry.is_file():
+                        yield rel_path
+
+    def list_files(self, subdir="", show=True):
+        files = sorted(self.iter_files(subdir))
+        if show:
+            # One write instead of a print per file
+            sys.stdout.write("📁 Project files:\n" + "".join(f" - {path}\n" for path in files))
+        return files
+
+    def _key(self, full_path):
+        return canonical_key(full_path)
+
+    def _keys_under(self, full_path):
+        """Memory keys of the file at full_path, or of every file below it if it's a folder."""
+        key = self._key(full_path)
+        prefix = key.rstrip(os.sep) + os.sep
+        return [k for k in self.memory.keys() if k == key or k.startswith(prefix)]
+
+    def delete_many(self, rel_paths):
+        """Deletes files and folders, then drops their memory entries in one update."""
+        stale, deleted = [], []
+        for rel_path in rel_paths:
+            full_path = self.base_dir / rel_path
+            if not full_path.exists():
+                print(f"❌ File not found: {rel_path}")
+                continue
+
+            if full_path.is_dir():
+                shutil.rmtree(full_path)
+                print(f"🗑️ Folder deleted: {rel_path}")
+            else:
+                full_path.unlink()
+                print(f"🗑️ File deleted: {rel_path}")
+            stale.extend(self._keys_under(full_path))
+            deleted.append(rel_path)
+
+        if stale:
+            self.memory.delete_many(stale)
+        return deleted
+
+    def move_many(self, moves):
+        """Moves (src, dest) pairs, then re-keys their memory entries in one update."""
+        renames, moved = {}, []
+        for old_rel_path, new_rel_path in moves:
+            old_path = self.base_dir / old_rel_path
+            new_path = self.base_dir / new_rel_path
+            if not old_path.exists():
+                print(f"❌ Path not found: {old_rel_path}")
+                continue
+
+            old_keys = self._keys_under(old_path)
+            new_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(old_path), str(new_path))
+            print(f"✏️ Renamed: {old_rel_path} → {new_rel_path}")
+
+            old_key, new_key = self._key(old_path), self._key(new_path)
+            for key in old_keys:
+                renames[key] = new_key + key[len(old_key):]
+            moved.append((old_rel_path, new_rel_path))
+
+        if renames:
+            self.memory.rename_many(renames)
+        return moved
 
     def delete(self, rel_path):
-        full_path = self.base_dir / rel_path
-        if not full_path.exists():
-            print(f"❌ File not found: {rel_path}")
-            return
-
-        if full_path.is_dir():
-            shutil.rmtree(full_path)
-            print(f"🗑️ Folder deleted: {rel_path}")
-        else:
-            full_path.unlink()
-            print(f"🗑️ File deleted: {rel_path}")
-
-        norm = os.path.normpath(str(full_path))
-        if norm in self.memory:
-            del self.memory[norm]
-            self.save_memory()
+        self.delete_many([rel_path])
 
     def rename(self, old_rel_path, new_rel_path):
-        old_path = self.base_dir / old_rel_path
-        new_path = self.base_dir / new_rel_path
-        new_path.parent.mkdir(parents=True, exist_ok=True)
-
-        if not old_path.exists():
-            print(f"❌ Path not found: {old_rel_path}")
-            return
-
-        shutil.move(str(old_path), str(new_path))
-        print(f"✏️ Renamed: {old_rel_path} → {new_rel_path}")
-
-        old_norm = os.path.normpath(str(old_path))
-        new_norm = os.path.normpath(str(new_path))
-
-        if old_norm in self.memory:
-            self.memory[new_norm] = self.memory.pop(old_norm)
-            self.save_memory()
+        self.move_many([(old_rel_path, new_rel_path)])
 
     def move_file(self, src_rel, dest_rel):
         self.rename(src_rel, dest_rel)
@@ -76,3 +146,4 @@ if __name__ == "__main__":
     # fm.rename("deepseek/sample.py", "deepseek/modules/sample_module.py")
     # fm.delete("deepseek/old_code/legacy_utils.py")
     # fm.move_file("deepseek/temp/code1.py", "deepseek/core/code1.py")
+    # fm.move_many([("deepseek/temp/a.py", "deepseek/core/a.py"), ("deepseek/temp/b.py", "deepseek/core/b.py")])
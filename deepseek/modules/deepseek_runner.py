@@ -1,47 +1,148 @@
 import os
+import sys
 import time
+import hashlib
 from pathlib import Path
-import tkinter as tk
+from datetime import datetime
+
+try:
+    import tkinter as tk
+except ImportError:  # headless: only the FIFO source is available
+    tk = None
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from error.jsonl_log import get_log, find_last
+from ollama_client import get_client, DEFAULT_MODEL
+from file_writer import write_text
 
 OUTPUT_FILE = "../memory/deepseek_output.txt"
+CAPTURE_LOG = "../memory/deepseek_captures.jsonl"  # every capture, rotated like the error logs
+FIFO_PATH = "../memory/clipboard.fifo"
+POLL_INTERVAL = 1  # seconds between clipboard reads
+DEBOUNCE = 0.75  # clipboard must stay unchanged this long before it is captured
 OFFLINE_MODE = True  # Set False to allow Git push
 
-def get_clipboard_text():
-    root = tk.Tk()
-    root.withdraw()  # Hide the GUI window
-    try:
-        text = root.clipboard_get()
-    except tk.TclError:
-        text = ""
-    root.destroy()
-    return text
 
-def monitor_clipboard():
-    last_text = ""
-    print("🧠 Clipboard monitoring started (no pyperclip). Copy any LLM output to auto-save it!")
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
 
-    while True:
+class TkClipboardSource:
+    """
+    Reads the clipboard through one hidden Tk root kept for the whole
+    session (instead of a new root per read). Yields text once it has
+    stayed the same for `debounce` seconds, so a burst of copies is
+    captured once, as its final value.
+    """
+
+    def __init__(self, poll_interval=POLL_INTERVAL, debounce=DEBOUNCE):
+        if tk is None:
+            raise RuntimeError("tkinter is not available; use the FIFO source instead")
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.root = tk.Tk()
+        self.root.withdraw()  # Hide the GUI window
+
+    def read(self):
         try:
-            text = get_clipboard_text()
-            if text != last_text and text.strip():
-                last_text = text
-                print("📎 New clipboard content detected. Saving to output file...")
-                save_output(text)
-            time.sleep(1)
-        except KeyboardInterrupt:
-            print("👋 Exiting clipboard monitor.")
-            break
+            return self.root.clipboard_get()
+        except tk.TclError:
+            return ""
+
+    def __iter__(self):
+        last_hash = None
+        pending, pending_hash, changed_at = None, None, 0.0
+        while True:
+            self.root.update()  # serve Tk's own events so the handle stays healthy
+            text = self.read()
+            digest = _digest(text)
+            now = time.monotonic()
+            if digest != pending_hash:
+                pending, pending_hash, changed_at = text, digest, now
+            elif pending_hash != last_hash and now - changed_at >= self.debounce:
+                last_hash = pending_hash
+                yield pending
+            time.sleep(self.poll_interval if pending_hash == last_hash else min(self.poll_interval, self.debounce))
+
+    def close(self):
+        self.root.destroy()
+
+
+class FifoSource:
+    """
+    Reads captures from a named pipe: each writer session (for example
+    `xclip -o > clipboard.fifo` or an editor hook) becomes one capture.
+    Blocks in the kernel between captures, so idling costs nothing.
+    """
+
+    def __init__(self, path=FIFO_PATH):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if not os.path.exists(path):
+            os.mkfifo(path)
+
+    def __iter__(self):
+        while True:
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                text = f.read()
+            if text:
+                yield text
 
-def save_output(text):
-    output_path = Path(OUTPUT_FILE)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    def close(self):
+        pass
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(text)
 
-    print(f"💾 Saved output to {OUTPUT_FILE}")
+def save_output(text, capture_log=CAPTURE_LOG, output_file=OUTPUT_FILE):
+    """
+    Appends the capture to the capture log, so nothing is lost between
+    writer runs, and atomically refreshes deepseek_output.txt with it for
+    tools that read only the latest output.
+    """
+    get_log(capture_log).append({
+        "timestamp": datetime.now().isoformat(),
+        "hash": _digest(text),
+        "text": text,
+    })
+
+    write_text(output_file, text)
+
+    print(f"💾 Saved output to {capture_log} and {output_file}")
     print("📣 Ready for DeepSeek Writer & Teacher to pick it up!")
 
+
+def stream_deepseek(prompt, model=DEFAULT_MODEL, use_cache=True):
+    """Sends a prompt to the model and yields its reply token by token."""
+    return get_client().stream_tokens(prompt, model=model, use_cache=use_cache)
+
+
+def run_deepseek(prompt, model=DEFAULT_MODEL, use_cache=True):
+    """Sends a prompt to the model and returns its full reply."""
+    return "".join(stream_deepseek(prompt, model=model, use_cache=use_cache))
+
+
+def monitor_clipboard(source=None, capture_log=CAPTURE_LOG):
+    source = source or TkClipboardSource()
+    # Don't re-save whatever was captured last before a restart
+    last = find_last(capture_log, lambda record: True) if os.path.exists(capture_log) else None
+    last_hash = last.get("hash") if last else None
+    print(f"🧠 Clipboard capture started ({type(source).__name__}). Copy any LLM output to auto-save it!")
+
+    try:
+        for text in source:
+            digest = _digest(text)
+            if digest != last_hash and text.strip():
+                last_hash = digest
+                print("📎 New clipboard content detected. Saving to output file...")
+                save_output(text, capture_log)
+    except KeyboardInterrupt:
+        print("👋 Exiting clipboard monitor.")
+    finally:
+        source.close()
+
+
 if __name__ == "__main__":
     print("🚀 Launching Clipboard Listener...")
-    monitor_clipboard()
+    if "--fifo" in sys.argv:
+        monitor_clipboard(FifoSource())
+    else:
+        monitor_clipboard()
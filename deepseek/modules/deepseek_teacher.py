@@ -1,16 +1,12 @@
-import os
-import json
-import requests
+from ollama_client import get_client
+from memory.memory_store import get_store, canonical_key
 
 def load_memory(memory_path="deepseek/memory/code_memory.json"):
     """
     Loads the memory index that contains information about files,
     their classes, functions, and imports.
     """
-    if not os.path.exists(memory_path):
-        return {}
-    with open(memory_path, "r") as f:
-        return json.load(f)
+    return get_store(memory_path)
 
 def read_code_file(filepath):
     """
@@ -24,7 +20,7 @@ def build_prompt(filepath, memory):
     Builds a prompt using file content and memory information
     to query the DeepSeek model with full context.
     """
-    filename = os.path.normpath(filepath)
+    filename = canonical_key(filepath)
     file_info = memory.get(filename, {})
 
     code = read_code_file(filepath)
@@ -50,31 +46,22 @@ Now explain the code:
 """
     return system_context
 
-def query_deepseek(prompt, model="deepseek-coder"):
+def query_deepseek(prompt, model="deepseek-coder", use_cache=True):
     """
     Sends the prompt to your local DeepSeek model running via Ollama
     and streams the explanation response back.
     """
-    response = requests.post(
-        "http://localhost:11434/api/generate",
-        json={"model": model, "prompt": prompt},
-        stream=True
-    )
+    return get_client().generate(prompt, model=model, use_cache=use_cache)
 
-    explanation = ""
-    for line in response.iter_lines():
-        if line:
-            explanation += line.decode("utf-8")
-    return explanation
-
-def explain(filepath):
+def explain(filepath, use_cache=True):
     """
     Main function to use: given a Python file path, it loads memory,
     builds a prompt, and returns DeepSeek's explanation.
+    Unchanged files are answered from the response cache unless use_cache=False.
     """
     memory = load_memory()
     prompt = build_prompt(filepath, memory)
-    explanation = query_deepseek(prompt)
+    explanation = query_deepseek(prompt, use_cache=use_cache)
     return explanation
 
 # Example test run
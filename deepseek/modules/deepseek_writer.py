@@ -1,10 +1,14 @@
-import os
 import json
-import subprocess
-import requests
 from pathlib import Path
-from datetime import datetime
-from deepseek_teacher import explain_code_like_teacher
+from deepseek_teacher import explain
+from ollama_client import get_client
+from memory.memory_store import get_store, canonical_key
+from memory.context_selector import select_context
+from memory.symbol_index import extract_symbols
+from batch_pipeline import Pipeline, Stage
+from lint_service import get_lint_service
+from file_writer import get_writer, write_text
+from git_utils import get_git_sync
 
 OFFLINE_MODE = True
 MEMORY_JSON = "deepseek/memory/code_memory.json"
@@ -12,68 +16,32 @@ OUTPUT_TXT = "memory/deepseek_output.txt"
 PROJECT_ROOT = Path(__file__).parent.parent
 ROOT_FOLDER = PROJECT_ROOT
 
-class GitSyncManager:
-    def __init__(self, repo_path="."):
-        self.repo_path = repo_path
-
-    def sync_changes(self, commit_message="Auto-sync from DeepSeek"):
-        if OFFLINE_MODE:
-            print("🌐 Offline mode. Git sync skipped.")
-            return
-        try:
-            subprocess.run(["git", "add", "."], cwd=self.repo_path, check=True)
-            full_msg = f"{commit_message} - {datetime.now()}"
-            subprocess.run(["git", "commit", "-m", full_msg], cwd=self.repo_path, check=True)
-            subprocess.run(["git", "push"], cwd=self.repo_path, check=True)
-            print("✅ Git sync complete.")
-        except subprocess.CalledProcessError as e:
-            print("⚠️ Git sync failed:", e)
+# Concurrency per batch stage; generation is bounded by the model server
+GENERATE_WORKERS = 2
+WRITE_WORKERS = 1
+LINT_WORKERS = 4
+EXPLAIN_WORKERS = 1
 
 class DeepSeekWriter:
     def __init__(self):
         self.memory_path = MEMORY_JSON
 
     def _load_memory(self):
-        if not os.path.exists(self.memory_path):
-            return {}
-        with open(self.memory_path, "r") as f:
-            return json.load(f)
+        return get_store(self.memory_path)
 
     def _save_memory(self, memory):
-        with open(self.memory_path, "w") as f:
-            json.dump(memory, f, indent=2)
-
-    def _extract_structure(self, code):
-        classes, functions, imports = [], [], []
-        for line in code.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("class "):
-                classes.append(stripped.split()[1].split("(")[0])
-            elif stripped.startswith("def "):
-                functions.append(stripped.split()[1].split("(")[0])
-            elif stripped.startswith("import ") or stripped.startswith("from "):
-                imports.append(stripped)
-        return classes, functions, imports
+        memory.save()
 
     def _query_deepseek(self, prompt, model="deepseek-coder"):
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": model, "prompt": prompt, "stream": True}
-        )
-        code = ""
-        for line in response.iter_lines():
-            if line:
-                code += line.decode("utf-8")
-        return code
+        return get_client().generate(prompt, model=model)
 
     def _write_file(self, code, filepath):
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(code)
-        return self._extract_structure(code)
+        if not write_text(filepath, code):
+            print(f"⏭️ Unchanged: {filepath}")
+        return extract_symbols(code)
 
-    def _build_prompt(self, user_prompt, memory):
-        memory_summary = json.dumps(memory, indent=2)
+    def _build_prompt(self, user_prompt, memory, filepath=None):
+        memory_summary = json.dumps(select_context(memory, user_prompt, target=filepath), indent=2)
         return f"""You are an expert developer AI.
 
 Your job is to generate a new Python file based on this instruction:
@@ -89,80 +57,140 @@ Current memory:
 """
 
     def generate_file_with_prompt(self, user_prompt, filepath):
+        item = {"prompt": user_prompt, "path": filepath}
+        for step in (self._generate_step, self._write_step, self._explain_step, self._lint_step):
+            item = step(item)
+
+    def generate_batch(self, jobs, lint=True, explain=True):
+        """
+        Generates many files at once from (user_prompt, filepath) pairs.
+        Generation, writing, linting and explanation run as separate stages
+        with their own worker counts, so model time overlaps lint time.
+        """
+        stages = [
+            Stage("generate", self._generate_step, GENERATE_WORKERS),
+            Stage("write", self._write_step, WRITE_WORKERS),
+        ]
+        if lint:
+            stages.append(Stage("lint", self._lint_step, LINT_WORKERS))
+        if explain:
+            stages.append(Stage("explain", self._explain_step, EXPLAIN_WORKERS))
+
+        report = Pipeline(stages).run({"prompt": prompt, "path": filepath} for prompt, filepath in jobs)
+        print(f"📦 Batch done in {report['seconds']}s → {report['completed']} ok, {report['failed']} failed")
+        return report
+
+    def _generate_step(self, item):
         memory = self._load_memory()
-        prompt = self._build_prompt(user_prompt, memory)
-        code = self._query_deepseek(prompt)
-        classes, functions, imports = self._write_file(code, filepath)
-
-        memory[os.path.normpath(filepath)] = {
-            "classes": classes,
-            "functions": functions,
-            "imports": imports
-        }
-        self._save_memory(memory)
+        prompt = self._build_prompt(item["prompt"], memory, item["path"])
+        item["code"] = self._query_deepseek(prompt)
+        return item
 
-        explain_code_like_teacher(filepath, code)
-        self._check_and_fix_errors(filepath)
+    def _write_step(self, item):
+        filepath = item["path"]
+        entry = self._write_file(item["code"], filepath)
+
+        memory = self._load_memory()
+        memory[canonical_key(filepath)] = entry
+        self._save_memory(memory)
 
         print(f"✅ Generated: {filepath}")
-        print(f"📚 Memory updated with → Classes: {classes}, Functions: {functions}")
+        print(f"📚 Memory updated with → Classes: {entry.get('classes')}, Functions: {entry.get('functions')}")
+        return item
 
-    def _check_and_fix_errors(self, file_path):
-        ext = Path(file_path).suffix
-        if ext == ".py":
-            subprocess.run(["pylint", file_path])
-            subprocess.run(["autopep8", "--in-place", "--aggressive", file_path])
-        elif ext in [".js", ".ts"]:
-            subprocess.run(["eslint", file_path, "--fix"])
-        elif ext == ".dart":
-            subprocess.run(["dart", "analyze", file_path])
-        else:
-            print(f"⚠️ No linter setup for {ext}")
+    def _explain_step(self, item):
+        item["explanation"] = explain(item["path"])
+        print(f"🧠 Explanation for {item['path']}:\n{item['explanation']}")
+        return item
 
-    def execute_batch_from_memory(self, memory_txt_path=OUTPUT_TXT):
+    def _lint_step(self, item):
+        self._check_and_fix_errors(item["path"])
+        return item
+
+    def _check_and_fix_errors(self, file_path):
+        result = get_lint_service().lint_file(file_path)
+        for d in result["diagnostics"]:
+            print(f"  {file_path}:{d['line']}:{d['column']}: {d['code']} {d['message']}")
+        if result["fixed"]:
+            print(f"🧹 Auto-formatted: {file_path}")
+        return result
+
+    def execute_batch_from_memory(self, memory_txt_path=OUTPUT_TXT, lint=False):
         path = Path(memory_txt_path)
         if not path.exists():
             print("❌ No memory instruction file found.")
             return
 
-        with open(path, "r", encoding="utf-8") as f:
-            text = f.read()
-
-        instructions = self._extract_batch_instructions(text)
-        self._write_batch_files(instructions)
+        # The dump is parsed as it is read, so each file is written as soon as its block ends
+        # fsyncs are grouped and done once the whole batch is on disk
+        with open(path, "r", encoding="utf-8") as f, get_writer().batch() as written:
+            instructions = self._iter_batch_instructions(f)
+            if lint:
+                Pipeline([
+                    Stage("write", self._write_batch_item, WRITE_WORKERS),
+                    Stage("lint", self._check_and_fix_errors, LINT_WORKERS),
+                ]).run(instructions)
+            else:
+                self._write_batch_files(instructions)
 
-        GitSyncManager().sync_changes("Auto-batch write from DeepSeek")
-
-    def _extract_batch_instructions(self, text):
-        instructions = []
-        lines = text.splitlines()
+        if OFFLINE_MODE:
+            print("🌐 Offline mode. Git sync skipped.")
+        else:
+            # Only the files this batch changed; nearby batches share one commit, pushed in the background
+            get_git_sync().sync_changes("Auto-batch write from DeepSeek", written)
+
+    def _iter_batch_instructions(self, lines):
+        """
+        Yields (path, content) for each `Create a file:` block in an
+        iterable of lines, as soon as the block ends. Only one block is
+        held in memory at a time. If a block has a ``` fence, only the
+        code inside the first fence is kept.
+        """
         current_file = None
         current_content = []
+        fence = None  # None: no fence seen yet, "open": inside it, "closed": past it
 
         for line in lines:
+            line = line.rstrip("\r\n")
             if line.startswith("Create a file:"):
                 if current_file:
-                    instructions.append((current_file, "\n".join(current_content)))
-                    current_content = []
+                    yield current_file, "\n".join(current_content)
                 current_file = line.split(":", 1)[1].strip()
-            elif current_file:
+                current_content = []
+                fence = None
+            elif not current_file or fence == "closed":
+                continue
+            elif line.lstrip().startswith("```"):
+                if fence is None:
+                    fence = "open"
+                    current_content = []  # drop any prose before the code
+                else:
+                    fence = "closed"
+            else:
                 current_content.append(line)
 
         if current_file:
-            instructions.append((current_file, "\n".join(current_content)))
-
-        return instructions
+            yield current_file, "\n".join(current_content)
 
     def _write_batch_files(self, instructions):
-        for rel_path, content in instructions:
-            full_path = ROOT_FOLDER / rel_path
-            full_path.parent.mkdir(parents=True, exist_ok=True)
+        for instruction in instructions:
+            self._write_batch_item(instruction)
 
-            with open(full_path, "w", encoding="utf-8") as f:
-                f.write("# 🧠 Auto-generated by DeepSeek\n")
-                f.write(content.strip() + "\n")
+    def _write_batch_item(self, instruction):
+        rel_path, content = instruction
+        full_path = ROOT_FOLDER / rel_path
 
+        if write_text(full_path, "# 🧠 Auto-generated by DeepSeek\n" + content.strip() + "\n"):
             print(f"✅ Created: {rel_path}")
+        else:
+            print(f"⏭️ Unchanged: {rel_path}")
+        return str(full_path)
+
+def write_output(path, text):
+    """Writes the final result of a run to `path`, atomically; skipped if unchanged."""
+    if write_text(path, text):
+        print(f"💾 Output written to {path}")
+    return path
 
 # Example Usage
 if __name__ == "__main__":
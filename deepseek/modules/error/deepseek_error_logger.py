@@ -1,16 +1,13 @@
 # deepseek_error_logger.py
 import traceback
-import json
 import os
+import sys
 from datetime import datetime
 
-ERROR_LOG_PATH = "deepseek/memory/deepseek" \
-"error_logs.json"
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from error.jsonl_log import get_log
 
-# Ensure error log file exists
-if not os.path.exists(ERROR_LOG_PATH):
-    with open(ERROR_LOG_PATH, 'w') as f:
-        json.dump([], f)
+ERROR_LOG_PATH = "deepseek/memory/deepseek_error_logs.jsonl"
 
 def log_error(file_name, function_name, error, code_context=None):
     error_entry = {
@@ -23,11 +20,7 @@ def log_error(file_name, function_name, error, code_context=None):
         "code_context": code_context or ""
     }
 
-    with open(ERROR_LOG_PATH, 'r+') as f:
-        logs = json.load(f)
-        logs.append(error_entry)
-        f.seek(0)
-        json.dump(logs, f, indent=4)
+    get_log(ERROR_LOG_PATH).append(error_entry)
 
 def deepseek_try(func):
     """
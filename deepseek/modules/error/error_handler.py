@@ -2,49 +2,57 @@
 
 import os
 import json
-import requests
-import traceback
-import runpy
-
-def run_and_log(filepath, error_log_path="deepseek/errors/error_logs.json"):
-    try:
-        runpy.run_path(filepath, run_name="__main__")
+from datetime import datetime
+from ollama_client import get_client, strip_code_fences
+from sandbox import get_sandbox
+from file_writer import write_text
+from memory.memory_store import get_store
+from memory.context_selector import select_context
+from error.jsonl_log import get_log, find_last
+from error.fingerprint import fingerprint, get_learned_fixes
+
+ERROR_LOG_PATH = "deepseek/errors/error_logs.jsonl"
+
+def run_and_log(filepath, error_log_path=ERROR_LOG_PATH):
+    # Runs in a separate, limited process so a crashing or hanging file can't take us down
+    result = get_sandbox().run(filepath)
+    if result["status"] == "success":
         print("✅ No error while running:", filepath)
-    except Exception as e:
+    else:
+        stderr = result.get("error", "").strip()
         error_entry = {
+            "timestamp": datetime.now().isoformat(),
             "filepath": filepath,
-            "error": str(e),
-            "traceback": traceback.format_exc()
+            "error": stderr.splitlines()[-1] if stderr else result["status"],
+            "traceback": stderr,
+            "fingerprint": fingerprint(stderr or result["status"])
         }
 
         # Save the error
-        if os.path.exists(error_log_path):
-            with open(error_log_path, "r") as f:
-                errors = json.load(f)
-        else:
-            errors = {}
-
-        errors[filepath] = error_entry
-        os.makedirs(os.path.dirname(error_log_path), exist_ok=True)
-        with open(error_log_path, "w") as f:
-            json.dump(errors, f, indent=2)
+        get_log(error_log_path).append(error_entry)
 
         print(f"❌ Error captured and logged for: {filepath}")
         print("🧠 Waiting for your permission to auto-fix...")
 
-def smart_fix(filepath, memory_path="deepseek/memory/code_memory.json", error_log_path="deepseek/errors/error_logs.json"):
+def smart_fix(filepath, memory_path="deepseek/memory/code_memory.json", error_log_path=ERROR_LOG_PATH,
+              error_entry=None):
+    """
+    Asks DeepSeek to fix `filepath` given its last recorded error (or the
+    `error_entry` passed in), writes the fixed code back and returns it.
+    A fix learned earlier for the same error fingerprint is replayed
+    instead of asking the model.
+    """
     if not os.path.exists(filepath):
         print(f"❌ File not found: {filepath}")
         return
 
-    if not os.path.exists(error_log_path):
-        print(f"❌ No error logs found at {error_log_path}")
-        return
+    if error_entry is None:
+        if not os.path.exists(error_log_path):
+            print(f"❌ No error logs found at {error_log_path}")
+            return
 
-    # Load the last error for this file
-    with open(error_log_path, "r") as f:
-        all_errors = json.load(f)
-    error_entry = all_errors.get(filepath)
+        # Load the last error for this file
+        error_entry = find_last(error_log_path, lambda e: e.get("filepath") == filepath, include_rotated=True)
     if not error_entry:
         print(f"⚠️ No recorded errors for {filepath}")
         return
@@ -56,11 +64,14 @@ def smart_fix(filepath, memory_path="deepseek/memory/code_memory.json", error_lo
     with open(filepath, "r", encoding="utf-8") as f:
         original_code = f.read()
 
+    learned_code = get_learned_fixes().apply(error_traceback or error_message, original_code)
+    if learned_code is not None and learned_code != original_code:
+        write_text(filepath, learned_code)
+        print(f"⚡ Applied learned fix to: {filepath}")
+        return learned_code
+
     # Load memory
-    memory = {}
-    if os.path.exists(memory_path):
-        with open(memory_path, "r") as f:
-            memory = json.load(f)
+    memory = select_context(get_store(memory_path), error_message + "\n" + error_traceback, target=filepath)
 
     # Build the prompt
     prompt = f"""
@@ -83,4 +94,13 @@ Fix the following Python file based on the traceback error below:
 Return the complete updated code ONLY.
 """
 
-    # Ask DeepSeek to
+    # Ask DeepSeek to fix it and write the result back
+    fixed_code = strip_code_fences(get_client().generate(prompt))
+    if not fixed_code.strip():
+        print(f"⚠️ DeepSeek returned no code for {filepath}")
+        return
+
+    write_text(filepath, fixed_code)
+    print(f"🔧 Applied fix to: {filepath}")
+    return fixed_code
+
@@ -0,0 +1,176 @@
+# fingerprint.py
+import os
+import re
+import sys
+import time
+import difflib
+import hashlib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.memory_store import get_store
+
+LEARNED_ERRORS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "learned_errors.json")
+MAX_HUNKS = 5  # fixes touching more places than this are rewrites, not reusable
+MAX_CHANGED_RATIO = 0.5  # nor are fixes that change more than half of the lines
+MAX_FIXES = 5  # different fixes kept per fingerprint
+
+_FRAME = re.compile(r'^\s*File "(?P<file>[^"]+)", line \d+, in (?P<func>.+)$')
+_EXCEPTION = re.compile(r"^(?P<type>[A-Za-z_][\w.]*(?:Error|Exception|Exit|Interrupt|Warning)?)(?::\s*(?P<msg>.*))?$")
+_IDENTIFIER = re.compile(r"[A-Za-z_][\w]*(\.[A-Za-z_][\w]*)*")
+# Frames from the machinery that launched the script, not from the script itself
+_LAUNCHER_FILES = ("runpy", "fork_runner.py", "sandbox.py", "<frozen ")
+
+
+def _is_library(path):
+    return "site-packages" in path or f"{os.sep}lib{os.sep}python" in path
+
+
+def _quoted(match):
+    # Names ('np', 'numpy.linalg', 'user_id') are what tell one NameError, ImportError,
+    # AttributeError or KeyError from another, so they stay; other literals vary per run
+    return match.group(0) if _IDENTIFIER.fullmatch(match.group(2)) else "<str>"
+
+
+def normalize_message(message):
+    """Drops the parts of an error message that vary between occurrences, keeping identifiers."""
+    message = re.sub(r"0x[0-9a-fA-F]+", "<addr>", message)
+    message = re.sub(r"(['\"])(.*?)\1", _quoted, message)
+    message = re.sub(r"(?<![\w.])\d+(\.\d+)?\b", "<n>", message)
+    return message.strip()
+
+
+def parse_traceback(traceback_text):
+    """Returns (exception type, normalised message, [frame, ...]) for a Python traceback."""
+    frames = []
+    exc_type, message = "", ""
+    for line in traceback_text.splitlines():
+        match = _FRAME.match(line)
+        if match:
+            path, func = match.group("file"), match.group("func").strip()
+            if any(marker in path for marker in _LAUNCHER_FILES):
+                continue
+            # User files differ per generated project, so only library frames keep their name
+            where = os.path.basename(path) if _is_library(path) else "<user>"
+            frames.append(f"{where}:{func}")
+            continue
+        stripped = line.strip()
+        if stripped and not line.startswith(" ") and not stripped.startswith("Traceback"):
+            match = _EXCEPTION.match(stripped)
+            if match:
+                exc_type = match.group("type")
+                message = normalize_message(match.group("msg") or "")
+    return exc_type, message, frames
+
+
+def fingerprint(traceback_text):
+    """Stable id for a failure: exception type, normalised message and stripped frames."""
+    exc_type, message, frames = parse_traceback(traceback_text)
+    if not exc_type:
+        return hashlib.sha1(traceback_text.strip().encode("utf-8")).hexdigest()
+    key = "|".join([exc_type, message, ">".join(frames)])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _hunks(before, after):
+    """Line replacements (with one line of context) that turn `before` into `after`."""
+    old, new = before.splitlines(keepends=True), after.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(a=old, b=new, autojunk=False)
+    hunks, changed = [], 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        changed += max(i2 - i1, j2 - j1)
+        lo, hi = max(0, i1 - 1), min(len(old), i2 + 1)
+        # Context on both sides so the old block is specific enough to find again
+        new_lo = j1 - (i1 - lo)
+        new_hi = j2 + (hi - i2)
+        hunks.append(["".join(old[lo:hi]), "".join(new[new_lo:new_hi])])
+    if not hunks or len(hunks) > MAX_HUNKS or changed > max(1, len(old)) * MAX_CHANGED_RATIO:
+        return None
+    return hunks
+
+
+class LearnedFixes:
+    """
+    Index of fixes that made an error go away, keyed by fingerprint.
+    A fix is stored as small search/replace hunks, so it can be replayed
+    on another file that fails the same way without asking the model.
+    Up to MAX_FIXES different fixes are kept per fingerprint; the ones
+    that worked most often are tried first.
+    """
+
+    def __init__(self, path=LEARNED_ERRORS_PATH):
+        self.store = get_store(path)
+
+    def learn(self, traceback_text, before, after):
+        hunks = _hunks(before, after)
+        if hunks is None:
+            return False
+        key = fingerprint(traceback_text)
+        exc_type, message, _ = parse_traceback(traceback_text)
+        fixes = [dict(fix) for fix in _fixes(self.store.get(key, {}))]
+        for fix in fixes:
+            if fix["hunks"] == hunks:
+                fix["learned"] = time.time()
+                break
+        else:
+            fixes.append({"hunks": hunks, "hits": 0, "learned": time.time()})
+        # Keep the fixes that worked most often, then the newest
+        fixes.sort(key=lambda fix: (fix["hits"], fix["learned"]), reverse=True)
+        self.store[key] = {"exc_type": exc_type, "message": message, "fixes": fixes[:MAX_FIXES]}
+        return True
+
+    def forget(self, traceback_text, hunks=None):
+        """Drops one fix (by its hunks) for this error, or all of them."""
+        key = fingerprint(traceback_text)
+        entry = self.store.get(key)
+        if not entry:
+            return
+        fixes = [fix for fix in _fixes(entry) if hunks is not None and fix["hunks"] != hunks]
+        if fixes:
+            self.store[key] = dict(entry, fixes=fixes)
+        else:
+            self.store.pop(key, None)
+
+    def suggest(self, traceback_text, code):
+        """(fixed code, hunks) for the first learned fix that applies cleanly, or (None, None)."""
+        for fix in _fixes(self.store.get(fingerprint(traceback_text), {})):
+            fixed = _apply_hunks(code, fix["hunks"])
+            if fixed is not None and fixed != code:
+                return fixed, fix["hunks"]
+        return None, None
+
+    def apply(self, traceback_text, code):
+        """Returns `code` with a learned fix applied, or None if there is none that fits."""
+        fixed, hunks = self.suggest(traceback_text, code)
+        if fixed is None:
+            return None
+        key = fingerprint(traceback_text)
+        entry = self.store[key]
+        fixes = [dict(fix, hits=fix["hits"] + 1) if fix["hunks"] == hunks else fix for fix in _fixes(entry)]
+        self.store[key] = dict(entry, fixes=fixes)
+        return fixed
+
+
+def _fixes(entry):
+    if "hunks" in entry:  # written before several fixes were kept per fingerprint
+        return [{"hunks": entry["hunks"], "hits": entry.get("hits", 0), "learned": entry.get("learned", 0)}]
+    return entry.get("fixes", [])
+
+
+def _apply_hunks(code, hunks):
+    for old, new in hunks:
+        if code.count(old) != 1:
+            return None
+        code = code.replace(old, new, 1)
+    return code
+
+
+_learned = None
+
+
+def get_learned_fixes() -> LearnedFixes:
+    global _learned
+    if _learned is None:
+        _learned = LearnedFixes()
+    return _learned
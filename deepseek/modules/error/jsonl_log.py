@@ -0,0 +1,137 @@
+# jsonl_log.py
+import os
+import gzip
+import json
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads in this process are serialised
+    fcntl = None
+
+MAX_BYTES = 5 * 1024 * 1024  # rotate the live log past this size
+BACKUPS = 5  # rotated .gz files kept
+
+
+class JsonlLog:
+    """
+    Append-only log with one JSON record per line.
+
+    Each record is written with a single os.write on an O_APPEND descriptor,
+    so appends cost the same however long the history is. A lock file
+    (flock) keeps writers in other processes from interleaving with a
+    rotation; rotated files are gzip-compressed as path.1.gz, path.2.gz...
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._fd = None
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+
+    def _open(self):
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _current_fd(self):
+        # Another process may have rotated the file under us; follow the path
+        try:
+            same = self._fd is not None and os.fstat(self._fd).st_ino == os.stat(self.path).st_ino
+        except FileNotFoundError:
+            same = False
+        if not same:
+            self._open()
+        return self._fd
+
+    def append(self, record: dict):
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                fd = self._current_fd()
+                if self.max_bytes and os.fstat(fd).st_size + len(data) > self.max_bytes:
+                    self._rotate()
+                    fd = self._current_fd()
+                os.write(fd, data)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _rotate(self):
+        oldest = f"{self.path}.{self.backups}.gz"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}.gz"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}.gz")
+
+        rotated = f"{self.path}.1"
+        os.replace(self.path, rotated)
+        self._open()
+        with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            os.close(self._lock_fd)
+
+
+def iter_records(path, include_rotated=True):
+    """Lazily yields records oldest first, skipping lines that aren't valid JSON."""
+    path = os.path.abspath(path)
+    files = []
+    if include_rotated:
+        i = 1
+        while os.path.exists(f"{path}.{i}.gz"):
+            files.append(f"{path}.{i}.gz")
+            i += 1
+        files.reverse()
+    if os.path.exists(path):
+        files.append(path)
+
+    for name in files:
+        opener = gzip.open if name.endswith(".gz") else open
+        try:
+            with opener(name, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            continue  # rotated away while we were reading
+
+
+def find_last(path, predicate, include_rotated=False):
+    """Most recent record matching predicate(record), or None."""
+    found = None
+    for record in iter_records(path, include_rotated=include_rotated):
+        if predicate(record):
+            found = record
+    return found
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_log(path) -> JsonlLog:
+    """Returns the one shared writer for this log path."""
+    key = os.path.abspath(path)
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None:
+            log = JsonlLog(key)
+            _logs[key] = log
+        return log
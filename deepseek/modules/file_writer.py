@@ -0,0 +1,147 @@
+# file_writer.py
+
+import os
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+
+def _hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _fsync_path(path, directory=False):
+    flags = os.O_RDONLY | (getattr(os, "O_DIRECTORY", 0) if directory else 0)
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return  # removed since, or a platform that can't open directories
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class AtomicWriter:
+    """
+    Writes generated files so that readers never see half a file and
+    identical content never touches the disk:
+
+    - content is compared by hash with what's already there (using a
+      cached hash while the file's mtime/size are unchanged) and the
+      write is skipped if nothing changed, so mtimes stay put and
+      re-indexing, linting and git see no change;
+    - new content goes to a temp file in the same folder and is renamed
+      over the target;
+    - outside a batch() each write is fsynced; inside one, fsyncs of
+      the files and their folders are done together when the batch ends,
+      and the batch collects the paths that were actually written.
+    """
+
+    def __init__(self):
+        self._known = {}  # path -> ((mtime_ns, size), hash) of content we wrote or read
+        self._pending = set()  # files written in the current batch, not yet fsynced
+        self._depth = 0
+        self._recorders = []  # one set per open batch, receiving written paths
+        self._lock = threading.Lock()
+
+    def _same_content(self, path, data, digest):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if st.st_size != len(data):
+            return False
+        stamp = (st.st_mtime_ns, st.st_size)
+        known = self._known.get(path)
+        if known and known[0] == stamp:
+            return known[1] == digest
+        with open(path, "rb") as f:
+            current = _hash(f.read())
+        self._known[path] = (stamp, current)
+        return current == digest
+
+    def write(self, path, content, encoding="utf-8") -> bool:
+        """Writes `content` to `path` unless it already holds exactly that. Returns True if written."""
+        path = os.path.abspath(path)
+        data = content.encode(encoding) if isinstance(content, str) else content
+        digest = _hash(data)
+        with self._lock:
+            if self._same_content(path, data, digest):
+                return False
+            batching = self._depth > 0
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                if not batching:
+                    f.flush()
+                    os.fsync(f.fileno())
+            try:
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+            except FileNotFoundError:
+                os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        st = os.stat(path)
+        with self._lock:
+            self._known[path] = ((st.st_mtime_ns, st.st_size), digest)
+            if self._depth > 0:
+                self._pending.add(path)
+            for written in self._recorders:
+                written.add(path)
+        if not batching:
+            _fsync_path(directory, directory=True)
+        return True
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers fsyncs until the (outermost) batch ends, then syncs each file
+        and folder once. Yields the set of paths written during the batch.
+        """
+        written = set()
+        with self._lock:
+            self._depth += 1
+            self._recorders.append(written)
+        try:
+            yield written
+        finally:
+            with self._lock:
+                self._depth -= 1
+                self._recorders = [r for r in self._recorders if r is not written]
+                if self._depth == 0:
+                    pending, self._pending = self._pending, set()
+                else:
+                    pending = set()
+            for path in pending:
+                _fsync_path(path)
+            for directory in {os.path.dirname(path) for path in pending}:
+                _fsync_path(directory, directory=True)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> AtomicWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AtomicWriter()
+        return _writer
+
+
+def write_text(path, content) -> bool:
+    """Atomically writes `content` to `path` through the shared writer; False if it was unchanged."""
+    return get_writer().write(path, content)
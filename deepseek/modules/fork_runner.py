@@ -0,0 +1,303 @@
+# fork_runner.py
+
+import os
+import sys
+import json
+import time
+import atexit
+import queue
+import signal
+import selectors
+import threading
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sandbox import _limit_resources, CPU_LIMIT, MEMORY_LIMIT_MB, FILE_SIZE_LIMIT_MB, MAX_OUTPUT
+
+MAX_RUNTIME = 15  # seconds per run, same as gaurdian.run_file_safe
+FORK_SERVERS = 2  # warm servers, i.e. runs at the same time
+# Imported once in the server so forked children start with them already loaded
+PRELOAD_MODULES = [
+    "argparse", "asyncio", "collections", "csv", "dataclasses", "datetime", "functools",
+    "itertools", "json", "logging", "math", "pathlib", "random", "re", "sqlite3",
+    "string", "subprocess", "threading", "typing", "unittest", "urllib.request",
+    "requests", "numpy", "pandas",
+]
+
+
+# -- server side (runs in its own interpreter) ------------------------------
+
+def _vm_size_mb():
+    """Address space already mapped by this process (0 where /proc isn't available)."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _print_script_traceback(path, exc):
+    """Prints the traceback like `python path` would: from the script's first frame on."""
+    import traceback
+    tb = exc.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != path:
+        tb = tb.tb_next
+    # No script frame (e.g. a SyntaxError): the exception itself says where
+    traceback.print_exception(type(exc), exc, tb)
+
+
+def _finish_like_interpreter():
+    """What interpreter shutdown does before exiting: wait for non-daemon threads, run atexit."""
+    current = threading.current_thread()
+    for thread in threading.enumerate():
+        if thread is not current and not thread.daemon:
+            thread.join()
+    atexit._run_exitfuncs()
+
+
+def _child(path, cwd, out_w, err_w, proto_fds):
+    """Runs inside the forked child; never returns."""
+    code = 1
+    try:
+        atexit._clear()  # the server's handlers aren't the script's
+        os.setsid()
+        for fd in proto_fds:
+            os.close(fd)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(out_w, 1)
+        os.dup2(err_w, 2)
+        # The preloaded modules are already mapped; only what the script adds counts
+        _limit_resources(CPU_LIMIT, MEMORY_LIMIT_MB + _vm_size_mb(), FILE_SIZE_LIMIT_MB)()
+        if cwd:
+            os.chdir(cwd)
+
+        import runpy
+        sys.argv = [path]
+        sys.path[0] = os.path.dirname(os.path.abspath(path))
+        try:
+            runpy.run_path(path, run_name="__main__")
+            code = 0
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException as e:
+            _print_script_traceback(path, e)
+            code = 1
+        _finish_like_interpreter()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code)
+
+
+def _collect(pid, out_r, err_r, timeout):
+    """
+    Reads the child's output until it exits (or the timeout hits), then
+    kills anything left in its session and drains the pipes.
+    """
+    chunks = {out_r: [], err_r: []}
+    sizes = {out_r: 0, err_r: 0}
+    selector = selectors.DefaultSelector()
+    for fd in chunks:
+        selector.register(fd, selectors.EVENT_READ)
+
+    def read_ready(wait):
+        for key, _ in selector.select(wait):
+            data = os.read(key.fd, 65536)
+            if not data:
+                selector.unregister(key.fd)
+            elif sizes[key.fd] < MAX_OUTPUT:
+                chunks[key.fd].append(data)
+                sizes[key.fd] += len(data)
+
+    deadline = time.monotonic() + timeout
+    timed_out = False
+    while True:
+        # wait4 with WNOHANG reaps the child (with its rusage) as soon as it exits
+        reaped, status, usage = os.wait4(pid, os.WNOHANG)
+        if reaped:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        if selector.get_map():
+            read_ready(min(remaining, 0.05))
+        else:
+            time.sleep(min(remaining, 0.005))
+
+    # Kill the session so background children can't hold the pipes open
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    if not reaped:
+        _, status, usage = os.wait4(pid, 0)
+    while selector.get_map():
+        read_ready(0.05)
+    selector.close()
+    os.close(out_r)
+    os.close(err_r)
+
+    decode = lambda fd: b"".join(chunks[fd]).decode("utf-8", errors="replace")[:MAX_OUTPUT]
+    return timed_out, os.waitstatus_to_exitcode(status), usage, decode(out_r), decode(err_r)
+
+
+def _handle(request, proto_fds):
+    start = time.time()
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(out_r)
+        os.close(err_r)
+        _child(request["path"], request.get("cwd"), out_w, err_w, proto_fds)
+    os.close(out_w)
+    os.close(err_w)
+
+    timeout = request.get("timeout") or MAX_RUNTIME
+    timed_out, returncode, usage, output, error = _collect(pid, out_r, err_r, timeout)
+    duration = round(time.time() - start, 2)
+
+    if timed_out:
+        return {"status": "timeout", "duration": timeout}
+    result = {
+        "output": output,
+        "error": error,
+        "returncode": returncode,
+        "duration": duration,
+        "cpu_time": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_kb": usage.ru_maxrss,
+    }
+    result["status"] = "success" if returncode == 0 else "error"
+    if result["status"] == "success":
+        del result["error"]
+    return result
+
+
+def serve():
+    """Fork server main loop: one JSON request per line on stdin, one reply per line on stdout."""
+    # Keep the protocol on private fds so children and stray prints can't corrupt it
+    proto_in = os.dup(0)
+    proto_out = os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(2, 1)
+
+    for name in PRELOAD_MODULES:
+        try:
+            __import__(name)
+        except Exception:
+            pass
+
+    reader = os.fdopen(proto_in, "r", encoding="utf-8")
+    writer = os.fdopen(proto_out, "w", encoding="utf-8")
+    writer.write(json.dumps({"ready": True}) + "\n")
+    writer.flush()
+    for line in reader:
+        request = json.loads(line)
+        try:
+            result = _handle(request, (proto_in, proto_out))
+        except Exception as e:
+            result = {"status": "exception", "error": str(e)}
+        writer.write(json.dumps(result) + "\n")
+        writer.flush()
+
+
+# -- client side ------------------------------------------------------------
+
+class _ForkServer:
+    """One warm interpreter; handles one request at a time."""
+
+    def __init__(self, python):
+        self.python = python
+        self._process = None
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            [self.python, os.path.abspath(__file__), "--serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        self._process.stdout.readline()  # wait for the preload to finish
+
+    def request(self, request) -> dict:
+        for _ in range(2):
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            try:
+                self._process.stdin.write(json.dumps(request) + "\n")
+                self._process.stdin.flush()
+                reply = self._process.stdout.readline()
+            except (BrokenPipeError, OSError):
+                reply = ""
+            if reply:
+                return json.loads(reply)
+            # The server died mid-request; restart it once and retry
+            self._process = None
+        return {"status": "exception", "error": "fork server is not responding"}
+
+    def close(self):
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process = None
+
+
+class ForkRunner:
+    """
+    Keeps warm interpreters with common modules pre-imported and forks them
+    for each run, so short generated scripts skip interpreter start-up and
+    imports. Up to `servers` runs go at once, one per server (started on
+    first use); further runs wait for a free one. Results match
+    gaurdian.run_file_safe.
+    """
+
+    def __init__(self, python=sys.executable, servers=FORK_SERVERS):
+        self.python = python
+        self._servers = [_ForkServer(python) for _ in range(servers)]
+        self._idle = queue.LifoQueue()  # the most recently used server is the warmest
+        for server in self._servers:
+            self._idle.put(server)
+
+    def run(self, filepath, timeout=MAX_RUNTIME, cwd=None) -> dict:
+        request = {"path": os.path.abspath(filepath), "timeout": timeout, "cwd": cwd}
+        server = self._idle.get()
+        try:
+            return server.request(request)
+        finally:
+            self._idle.put(server)
+
+    def close(self):
+        # Take every server so none is closed mid-run
+        servers = [self._idle.get() for _ in self._servers]
+        for server in servers:
+            server.close()
+            self._idle.put(server)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_fork_runner() -> ForkRunner:
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ForkRunner()
+        return _runner
+
+
+if __name__ == "__main__" and "--serve" in sys.argv:
+    serve()
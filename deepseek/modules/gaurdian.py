@@ -1,23 +1,139 @@
 import os
-import time
-import subprocess
+import sys
 import psutil
 import logging
 import psutil
 import GPUtil
 import logging
+import threading
+from collections import deque
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sandbox import get_sandbox
+from fork_runner import get_fork_runner
+
+# Sampler settings
+SAMPLE_INTERVAL = 1.0  # seconds between background readings
+SAMPLE_WINDOW = 10  # readings kept in the rolling window
+SMOOTHING = 0.3  # EMA weight given to the newest reading
+GPU_SAMPLE_EVERY = 5  # GPU queries are slow, so only every Nth reading
+HYSTERESIS = 5  # percent below threshold needed to clear an unsafe state
+
+
+class ResourceSampler:
+    """
+    Background thread that keeps a rolling window of CPU/RAM/VRAM readings.
+    Readers get the latest smoothed snapshot without ever sleeping.
+    """
+
+    def __init__(self,
+                 interval: float = SAMPLE_INTERVAL,
+                 window: int = SAMPLE_WINDOW,
+                 smoothing: float = SMOOTHING,
+                 gpu_every: int = GPU_SAMPLE_EVERY):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.gpu_every = max(1, gpu_every)
+        self.window = deque(maxlen=window)
+        self._snapshot = None
+        self._vram = 0.0
+        self._ticks = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return self
+            # One short blocking reading so there is always a snapshot to hand out
+            psutil.cpu_percent(interval=None)
+            self._sample(cpu_interval=0.1)
+            self._thread = threading.Thread(target=self._loop, name="resource-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception as e:
+                logging.getLogger("GuardianAngel").warning(f"Resource sampling failed: {e}")
+
+    def _read_vram(self) -> float:
+        try:
+            gpus = GPUtil.getGPUs()
+            return max([gpu.memoryUtil * 100 for gpu in gpus]) if gpus else 0.0
+        except Exception:
+            return 0.0
+
+    def _sample(self, cpu_interval=None):
+        # interval=None measures since the previous call, so it never blocks
+        reading = {
+            "cpu": psutil.cpu_percent(interval=cpu_interval),
+            "ram": psutil.virtual_memory().percent,
+        }
+        if self._ticks % self.gpu_every == 0:
+            self._vram = self._read_vram()
+        reading["vram"] = self._vram
+        self._ticks += 1
+        self.window.append(reading)
+
+        previous = self._snapshot
+        if previous is None:
+            smoothed = reading
+        else:
+            a = self.smoothing
+            smoothed = {key: a * reading[key] + (1 - a) * previous[key] for key in reading}
+        # Swapping the dict reference is atomic, so readers never see a half update
+        self._snapshot = {key: round(value, 2) for key, value in smoothed.items()}
+
+    def latest(self) -> dict:
+        if self._snapshot is None:
+            self.start()
+        return self._snapshot
+
+    def peak(self) -> dict:
+        readings = list(self.window)
+        if not readings:
+            return self.latest()
+        return {key: round(max(r[key] for r in readings), 2) for key in ("cpu", "ram", "vram")}
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> ResourceSampler:
+    """Returns the shared sampler, starting its thread on first use."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = ResourceSampler().start()
+        return _sampler
+
+
 class GuardianAngel:
     def __init__(self,
                  cpu_threshold: int = 85,
                  ram_threshold: int = 85,
                  vram_threshold: int = 90,
-                 log_file: str = "guardian_logs.log"):
+                 log_file: str = "guardian_logs.log",
+                 hysteresis: int = HYSTERESIS,
+                 sampler: ResourceSampler = None):
         self.cpu_threshold = cpu_threshold
         self.ram_threshold = ram_threshold
         self.vram_threshold = vram_threshold
         self.log_file = log_file
+        self.hysteresis = hysteresis
+        self.sampler = sampler or get_sampler()
+        self._safe = True
         self._setup_logger()
 
     def _setup_logger(self):
@@ -30,29 +146,19 @@ class GuardianAngel:
         self.logger = logging.getLogger("GuardianAngel")
 
     def get_system_stats(self) -> dict:
-        cpu_usage = psutil.cpu_percent(interval=1)
-        ram_usage = psutil.virtual_memory().percent
-
-        try:
-            gpus = GPUtil.getGPUs()
-            vram_usage = max([gpu.memoryUtil * 100 for gpu in gpus]) if gpus else 0
-        except Exception as e:
-            self.logger.warning(f"Unable to access GPU info: {e}")
-            vram_usage = 0
-
-        return {
-            "cpu": round(cpu_usage, 2),
-            "ram": round(ram_usage, 2),
-            "vram": round(vram_usage, 2)
-        }
+        return dict(self.sampler.latest())
 
     def is_safe_to_proceed(self) -> bool:
-        stats = self.get_system_stats()
+        stats = self.sampler.latest()
+        # Once blocked, stay blocked until usage drops clearly below the limits,
+        # so load hovering around a threshold doesn't flap between states.
+        margin = 0 if self._safe else self.hysteresis
         status = all([
-            stats["cpu"] < self.cpu_threshold,
-            stats["ram"] < self.ram_threshold,
-            stats["vram"] < self.vram_threshold
+            stats["cpu"] < self.cpu_threshold - margin,
+            stats["ram"] < self.ram_threshold - margin,
+            stats["vram"] < self.vram_threshold - margin
         ])
+        self._safe = status
 
         self._log_decision(stats, status)
         return status
@@ -67,8 +173,9 @@ class GuardianAngel:
             self.logger.warning(f"[UNSAFE] {message} — Operation Blocked")
 
     def warn_user(self):
+        stats = self.sampler.latest()
         print("\n⚠️  System load is too high for safe AI operations.")
-        print("🧠 CPU: {}% | 🗂 RAM: {}% | 🎮 VRAM: {}%".format(*self.get_system_stats().values()))
+        print("🧠 CPU: {}% | 🗂 RAM: {}% | 🎮 VRAM: {}%".format(stats["cpu"], stats["ram"], stats["vram"]))
         print("🛑 Operation halted to protect your machine.\n")
 
 
@@ -79,6 +186,7 @@ SAFE_MODE = True
 MAX_CPU = 85  # in percent
 MAX_RAM = 85  # in percent
 MAX_RUNTIME = 15  # seconds per file run
+USE_FORK_SERVER = hasattr(os, "fork")  # fork runs from a pre-warmed interpreter
 
 # Logging Setup
 LOG_DIR = "deepseek/safety/logs"
@@ -89,11 +197,28 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
+_guardian = None
+
+
+def get_guardian() -> GuardianAngel:
+    global _guardian
+    if _guardian is None:
+        _guardian = GuardianAngel()
+    return _guardian
+
+def run_safety_checks(permissions=""):
+    """Raises if the machine is too loaded to start an AI operation."""
+    guardian = get_guardian()
+    if not guardian.is_safe_to_proceed():
+        guardian.warn_user()
+        raise RuntimeError("System load is too high — operation blocked by GuardianAngel")
+
 def check_resources():
     """Returns True if system usage is safe."""
-    cpu = psutil.cpu_percent(interval=1)
-    ram = psutil.virtual_memory().percent
-    
+    stats = get_sampler().latest()
+    cpu = stats["cpu"]
+    ram = stats["ram"]
+
     if cpu > MAX_CPU or ram > MAX_RAM:
         logging.warning(f"High usage — CPU: {cpu}%, RAM: {ram}%")
         return False
@@ -108,28 +233,26 @@ def run_file_safe(filepath):
         return {"status": "skipped", "reason": "High usage"}
 
     print(f"🔒 Safe-running file: {filepath}")
-    try:
-        start = time.time()
-        process = subprocess.run(
-            ["python", filepath],
-            capture_output=True,
-            text=True,
-            timeout=MAX_RUNTIME
-        )
-        duration = round(time.time() - start, 2)
-        output = process.stdout
-        error = process.stderr
+    if USE_FORK_SERVER:
+        result = get_fork_runner().run(filepath, timeout=MAX_RUNTIME)
+    else:
+        result = get_sandbox().run(filepath, timeout=MAX_RUNTIME)
+    status = result["status"]
 
-        if process.returncode != 0:
-            logging.error(f"Crash in {filepath} — {error.strip()}")
-            return {"status": "error", "output": output, "error": error, "duration": duration}
-
-        logging.info(f"Success: {filepath} ({duration}s)")
-        return {"status": "success", "output": output, "duration": duration}
-
-    except subprocess.TimeoutExpired:
+    if status == "error":
+        logging.error(f"Crash in {filepath} — {result['error'].strip()}")
+    elif status == "timeout":
         logging.warning(f"Timeout: {filepath} > {MAX_RUNTIME}s")
-        return {"status": "timeout", "duration": MAX_RUNTIME}
-    except Exception as e:
-        logging.error(f"Exception running {filepath}: {e}")
-        return {"status": "exception", "error": str(e)}
+    elif status == "exception":
+        logging.error(f"Exception running {filepath}: {result['error']}")
+    else:
+        logging.info(f"Success: {filepath} ({result['duration']}s, "
+                     f"cpu {result['cpu_time']}s, peak {result['peak_rss_kb']} KB)")
+    return result
+
+def run_files_safe(filepaths):
+    """Runs a batch of files concurrently in the sandbox; returns {filepath: result}."""
+    if SAFE_MODE and not check_resources():
+        print("⚠️  High resource usage — skipping execution.")
+        return {path: {"status": "skipped", "reason": "High usage"} for path in filepaths}
+    return get_sandbox().run_many(filepaths, timeout=MAX_RUNTIME)
@@ -1,31 +1,209 @@
 # git_utils.py
 
+import os
+import time
+import atexit
+import threading
 import subprocess
 from datetime import datetime
 
 OFFLINE_MODE = False  # Set this to True if you want to disable Git sync temporarily
+GIT_REMOTE = "origin"  # remote name or URL (a local bare repo works too)
+GIT_BRANCH = None  # remote branch to push to; None pushes the current branch
+COMMIT_WINDOW = 5.0  # seconds; syncs requested within this window share one commit
 
-def manual_git_push(commit_message="Manual push from DeepSeek"):
+
+class GitSyncManager:
+    """
+    Commits and pushes generated files without touching the rest of the tree.
+
+    sync_changes(message, paths) stages only `paths`; calls arriving within
+    COMMIT_WINDOW seconds of the first are coalesced into one commit. Pushes
+    run on a background thread, so generation never waits on the network,
+    and a push requested while another is queued is merged into it.
+    Paths that no longer exist and were never tracked are dropped; if
+    staging or committing fails, the batch stays queued for the next sync.
+    Whatever is still pending when the interpreter exits is committed and
+    pushed before it goes.
+    Per-step timings of the last commit and push are kept in `timings`.
     """
-    🌐 Manually push all staged changes to Git.
+
+    def __init__(self, repo_path=".", remote=GIT_REMOTE, branch=GIT_BRANCH, window=COMMIT_WINDOW):
+        self.repo_path = repo_path
+        self.remote = remote
+        self.branch = branch
+        self.window = window
+        self.timings = {}
+        self._paths = set()
+        self._messages = []
+        self._timer = None
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()  # one git add/commit at a time
+        self._push_lock = threading.Lock()
+        self._push_wanted = False
+        self._push_thread = None
+
+    def _git(self, *args, input=None):
+        return subprocess.run(["git", *args], cwd=self.repo_path, input=input,
+                              capture_output=True, text=True)
+
+    def sync_changes(self, commit_message="Auto-sync from DeepSeek", paths=None):
+        """Queues `paths` (files written, changed or deleted) for the next coalesced commit and push."""
+        if paths is not None and not paths:
+            print("🌐 Nothing changed. Git sync skipped.")
+            return
+        with self._lock:
+            if paths is None:
+                self._paths.add(".")  # caller doesn't know what changed: stage everything, as before
+            else:
+                self._paths.update(os.path.abspath(p) for p in paths)
+            self._messages.append(commit_message)
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self._commit_pending)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self, push=True, wait=False):
+        """Commits anything pending right away; optionally pushes and waits for the push."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        committed = self._commit_pending(push=push)
+        if push and wait:
+            self.wait_for_push()
+        return committed
+
+    def _commit_pending(self, push=True):
+        with self._commit_lock:
+            with self._lock:
+                paths, self._paths = self._paths, set()
+                messages, self._messages = self._messages, []
+                self._timer = None
+            if not paths:
+                return False
+            committed = self._commit(paths, messages)
+            if committed is None:
+                with self._lock:
+                    self._paths |= paths
+                    self._messages[:0] = messages
+        if committed and push:
+            self.push_async()
+        return committed
+
+    def _stageable(self, paths):
+        """Drops paths git can't stage: gone from disk and never tracked (written, then deleted)."""
+        kept = set()
+        for path in paths:
+            if os.path.lexists(os.path.join(self.repo_path, path)) or \
+                    self._git("ls-files", "--error-unmatch", "--", path).returncode == 0:
+                kept.add(path)
+            else:
+                print(f"🌐 Skipping {path}: deleted before it was ever committed")
+        return kept
+
+    def _commit(self, paths, messages):
+        """Commits `paths`: True if committed, False if there was nothing to commit, None on failure."""
+        paths = self._stageable(paths)
+        if not paths:
+            return False
+        pathspec = "\0".join(sorted(paths)) + "\0"
+        start = time.perf_counter()
+        staged = self._git("add", "-A", "--pathspec-from-file=-", "--pathspec-file-nul", input=pathspec)
+        stage_seconds = time.perf_counter() - start
+        if staged.returncode != 0:
+            print("⚠️ Git staging failed:", staged.stderr.strip())
+            return None
+
+        summary = messages[0] if len(set(messages)) == 1 else f"{messages[0]} (+{len(messages) - 1} more)"
+        full_msg = f"{summary} - {datetime.now()}"
+        start = time.perf_counter()
+        # With a pathspec, only these paths are committed even if other files are staged
+        committed = self._git("commit", "-q", "-m", full_msg, "--pathspec-from-file=-", "--pathspec-file-nul",
+                              input=pathspec)
+        commit_seconds = time.perf_counter() - start
+        if committed.returncode != 0 and "nothing" in committed.stdout:
+            # e.g. the files were rewritten with the content already committed
+            self.timings = {"stage": round(stage_seconds, 3), "commit": round(commit_seconds, 3), "files": 0}
+            print("🌐 Nothing new to commit.")
+            return False
+        if committed.returncode != 0:
+            print("⚠️ Git commit failed:", (committed.stderr or committed.stdout).strip())
+            return None
+
+        self.timings = {"stage": round(stage_seconds, 3), "commit": round(commit_seconds, 3),
+                        "files": len(paths), "batches": len(messages)}
+        print(f"✅ Git commit: {len(messages)} batch(es), stage {self.timings['stage']}s, "
+              f"commit {self.timings['commit']}s")
+        return True
+
+    def push_async(self):
+        """Starts (or extends) the background push; returns immediately."""
+        with self._push_lock:
+            self._push_wanted = True
+            if self._push_thread is None:
+                self._push_thread = threading.Thread(target=self._push_loop, name="git-push", daemon=True)
+                self._push_thread.start()
+
+    def _push_loop(self):
+        while True:
+            with self._push_lock:
+                if not self._push_wanted:
+                    self._push_thread = None
+                    return
+                self._push_wanted = False
+            refspec = f"HEAD:{self.branch}" if self.branch else "HEAD"
+            start = time.perf_counter()
+            pushed = self._git("push", "-q", self.remote, refspec)
+            self.timings["push"] = round(time.perf_counter() - start, 3)
+            if pushed.returncode == 0:
+                print(f"🚀 Pushed to {self.remote} in {self.timings['push']}s")
+            else:
+                print("⚠️ Git push failed:", pushed.stderr.strip())
+
+    def wait_for_push(self, timeout=None):
+        thread = self._push_thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_git_sync(repo_path=".") -> GitSyncManager:
+    """Returns the shared sync manager for this repo, so commits coalesce across callers."""
+    key = os.path.abspath(repo_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = GitSyncManager(repo_path)
+        return manager
+
+
+@atexit.register
+def _flush_all():
+    # The commit timer and push thread are daemons; don't lose what they still hold
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        manager.flush(wait=True)
+
+
+def manual_git_push(commit_message="Manual push from DeepSeek", paths=None):
+    """
+    🌐 Manually push changes to Git (only `paths` if given, else everything).
     Includes timestamp and handles errors.
     """
     if OFFLINE_MODE:
         print("📴 Offline mode is enabled. Skipping Git push.")
         return
 
-    try:
-        print("📦 Staging all changes...")
-        subprocess.run(["git", "add", "."], check=True)
-
-        full_message = f"{commit_message} @ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        print(f"📝 Committing: {full_message}")
-        subprocess.run(["git", "commit", "-m", full_message], check=True)
-
-        print("🚀 Pushing to remote...")
-        subprocess.run(["git", "push"], check=True)
-
-        print("✅ Git push completed successfully!")
+    manager = get_git_sync()
+    print("📦 Committing changes...")
+    manager.sync_changes(commit_message, paths)
+    manager.flush(push=False)
 
-    except subprocess.CalledProcessError as e:
-        print("❌ Git push failed:", e)
+    print(f"🚀 Pushing to {manager.remote}...")
+    manager.push_async()
+    manager.wait_for_push()
+    print(f"⏱️ Timings: {manager.timings}")
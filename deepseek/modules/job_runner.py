@@ -0,0 +1,124 @@
+# job_runner.py
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MODEL = "deepseek-coder"
+MODEL_CONCURRENCY = {  # parallel generations per model; only these models are accepted
+    "deepseek-coder": 2,
+}
+MAX_FINISHED_JOBS = 500  # finished jobs kept around for polling
+
+
+class Job:
+    def __init__(self, model):
+        self.id = uuid.uuid4().hex
+        self.model = model
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        data = {
+            "job_id": self.id,
+            "model": self.model,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if self.status == "success":
+            data["result"] = self.result
+        elif self.status == "error":
+            data["message"] = self.error
+        return data
+
+
+class JobManager:
+    """
+    Runs submitted work in the background and keeps its status for polling.
+    Every model listed in MODEL_CONCURRENCY gets its own bounded pool, so a
+    slow model can't starve the others; other models are rejected.
+    Generation itself runs inside slot(model), which request threads
+    (plain and streamed runs) share with the jobs, so the local model
+    server never sees more than the model's limit.
+    """
+
+    def __init__(self, model_concurrency: dict = None, max_finished: int = MAX_FINISHED_JOBS):
+        self.model_concurrency = dict(MODEL_CONCURRENCY if model_concurrency is None else model_concurrency)
+        self.max_finished = max_finished
+        self._pools = {}
+        self._slots = {model: threading.BoundedSemaphore(n) for model, n in self.model_concurrency.items()}
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pool_for(self, model):
+        pool = self._pools.get(model)
+        if pool is None:
+            workers = self.model_concurrency[model]
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"karx-{model}")
+            self._pools[model] = pool
+        return pool
+
+    def check_model(self, model):
+        """Raises ValueError for models without a configured limit, so callers can't create pools at will."""
+        if model not in self.model_concurrency:
+            raise ValueError(f"Unknown model: {model} (allowed: {', '.join(sorted(self.model_concurrency))})")
+        return model
+
+    def slot(self, model):
+        """The model's generation slots; hold one (`with jobs.slot(model):`) while it generates."""
+        return self._slots[self.check_model(model)]
+
+    def submit(self, func, *args, model=DEFAULT_MODEL, **kwargs) -> Job:
+        """Queues func(*args, **kwargs) on the model's pool and returns its Job right away."""
+        self.check_model(model)
+        job = Job(model)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict_finished()
+            pool = self._pool_for(model)
+        pool.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        job.status = "running"
+        job.started = time.time()
+        try:
+            job.result = func(*args, **kwargs)
+            job.status = "success"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "error"
+        finally:
+            job.finished = time.time()
+            job.done.set()
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id) -> Job:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout=None) -> Job:
+        """Blocks until the job finishes or the timeout expires; returns None for unknown ids."""
+        job = self.get(job_id)
+        if job is not None:
+            job.done.wait(timeout)
+        return job
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.shutdown(wait=wait)
@@ -0,0 +1,229 @@
+# lint_service.py
+
+import os
+import json
+import hashlib
+import threading
+import subprocess
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from file_writer import write_text
+
+LINT_WORKERS = 2  # long-lived pylint/autopep8 processes
+CACHE_SIZE = 1024  # lint results remembered by content hash
+AUTOPEP8_OPTIONS = {"aggressive": 1}
+
+
+# -- worker process side ----------------------------------------------------
+
+def _warm_up():
+    """Runs once per worker so every later file skips pylint/autopep8 start-up."""
+    try:
+        import autopep8  # noqa: F401
+        import pylint.lint  # noqa: F401
+        from pylint.reporters import CollectingReporter  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _forget_module(path):
+    # astroid caches parsed modules; drop this file so edits are seen
+    try:
+        from astroid import MANAGER
+    except ImportError:
+        return
+    for name, module in list(MANAGER.astroid_cache.items()):
+        if getattr(module, "file", None) == path:
+            del MANAGER.astroid_cache[name]
+
+
+def _run_pylint(path):
+    try:
+        from pylint.lint import Run
+        from pylint.reporters import CollectingReporter
+    except ImportError:
+        return _run_pylint_subprocess(path)
+
+    _forget_module(path)
+    reporter = CollectingReporter()
+    Run([path, "--reports=n", "--score=n"], reporter=reporter, exit=False)
+    return [
+        {
+            "line": m.line,
+            "column": m.column,
+            "code": m.msg_id,
+            "symbol": m.symbol,
+            "category": m.category,
+            "message": m.msg,
+        }
+        for m in reporter.messages
+    ]
+
+
+def _run_pylint_subprocess(path):
+    result = subprocess.run(["pylint", path, "--output-format=json"], capture_output=True, text=True)
+    try:
+        messages = json.loads(result.stdout or "[]")
+    except json.JSONDecodeError:
+        return []
+    return [
+        {
+            "line": m.get("line"),
+            "column": m.get("column"),
+            "code": m.get("message-id"),
+            "symbol": m.get("symbol"),
+            "category": m.get("type"),
+            "message": m.get("message"),
+        }
+        for m in messages
+    ]
+
+
+def _autopep8(source):
+    try:
+        import autopep8
+    except ImportError:
+        return None
+    return autopep8.fix_code(source, options=AUTOPEP8_OPTIONS)
+
+
+def lint_python(path, source):
+    """Pylint diagnostics for the file, then the autopep8-formatted source (or None)."""
+    path = os.path.abspath(path)
+    diagnostics = _run_pylint(path)
+    fixed = _autopep8(source)
+    if fixed is None:
+        subprocess.run(["autopep8", "--in-place", "--aggressive", path])
+    return diagnostics, fixed
+
+
+# -- parent side ------------------------------------------------------------
+
+def _run_tool(cmd):
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return result.returncode, result.stdout
+
+
+def _lint_js(path):
+    _, out = _run_tool(["eslint", path, "--fix", "--format", "json"])
+    try:
+        reports = json.loads(out or "[]")
+    except json.JSONDecodeError:
+        return []
+    return [
+        {
+            "line": m.get("line"),
+            "column": m.get("column"),
+            "code": m.get("ruleId"),
+            "symbol": m.get("ruleId"),
+            "category": "error" if m.get("severity") == 2 else "warning",
+            "message": m.get("message"),
+        }
+        for report in reports for m in report.get("messages", [])
+    ]
+
+
+def _lint_dart(path):
+    _, out = _run_tool(["dart", "analyze", "--format=machine", path])
+    diagnostics = []
+    # SEVERITY|TYPE|CODE|FILE|LINE|COLUMN|LENGTH|MESSAGE
+    for line in out.splitlines():
+        parts = line.split("|")
+        if len(parts) >= 8:
+            diagnostics.append({
+                "line": int(parts[4]),
+                "column": int(parts[5]),
+                "code": parts[2],
+                "symbol": parts[2],
+                "category": parts[0].lower(),
+                "message": "|".join(parts[7:]),
+            })
+    return diagnostics
+
+
+class LintService:
+    """
+    Lints and formats files using warm worker processes instead of
+    launching pylint and autopep8 per file. Results are cached by content
+    hash, so re-linting an unchanged file is free.
+    """
+
+    def __init__(self, workers=LINT_WORKERS, cache_size=CACHE_SIZE):
+        context = multiprocessing.get_context("spawn")
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_warm_up)
+        self._threads = ThreadPoolExecutor(max_workers=workers * 2, thread_name_prefix="lint")
+        self._cache = OrderedDict()
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _cache_get(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def _cache_put(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def lint_file(self, file_path) -> dict:
+        """
+        Lints (and for .py, formats in place) one file.
+        Returns {"path", "diagnostics": [...], "fixed": bool, "cached": bool}.
+        """
+        ext = Path(file_path).suffix
+        with open(file_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        key = hashlib.sha1(f"{ext}\0{source}".encode("utf-8")).hexdigest()
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            diagnostics, fixed = cached
+            if fixed is not None and fixed != source:
+                write_text(file_path, fixed)
+            return {"path": file_path, "diagnostics": diagnostics, "fixed": fixed not in (None, source),
+                    "cached": True}
+
+        fixed = None
+        if ext == ".py":
+            diagnostics, fixed = self._pool.submit(lint_python, file_path, source).result()
+            if fixed is not None and fixed != source:
+                # The diagnostics are for the unformatted source; the formatted file gets linted on its own
+                write_text(file_path, fixed)
+        elif ext in [".js", ".ts"]:
+            diagnostics = _lint_js(file_path)
+        elif ext == ".dart":
+            diagnostics = _lint_dart(file_path)
+        else:
+            print(f"⚠️ No linter setup for {ext}")
+            return {"path": file_path, "diagnostics": [], "fixed": False, "cached": False}
+
+        self._cache_put(key, (diagnostics, fixed))
+        return {"path": file_path, "diagnostics": diagnostics, "fixed": fixed not in (None, source),
+                "cached": False}
+
+    def lint_files(self, file_paths) -> list:
+        """Lints a batch of files concurrently, returning results in input order."""
+        return list(self._threads.map(self.lint_file, file_paths))
+
+    def shutdown(self):
+        self._threads.shutdown()
+        self._pool.shutdown()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_lint_service() -> LintService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = LintService()
+        return _service
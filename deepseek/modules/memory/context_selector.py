@@ -0,0 +1,108 @@
+import os
+import re
+import sys
+import json
+import math
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.memory_sqlite import import_modules
+from memory.memory_store import canonical_key
+from memory.import_graph import ImportGraph, get_import_graph
+
+TOKEN_BUDGET = 1500  # rough token budget for the memory section of a prompt
+CHARS_PER_TOKEN = 4
+NEIGHBOUR_BOOST = 0.5  # share of the best score given to import-graph neighbours
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text):
+    """Splits paths, snake_case and CamelCase names into lowercase words."""
+    return [word.lower() for word in _WORD.findall(text) if len(word) > 1]
+
+
+def _entry_terms(path, entry):
+    terms = tokenize(path)
+    for key in ("classes", "functions"):
+        for name in entry.get(key, []):
+            terms.extend(tokenize(name))
+    for statement in entry.get("imports", []):
+        for module in import_modules(statement):
+            terms.extend(tokenize(module))
+    return terms
+
+
+def _neighbours(memory, target):
+    """Files the target imports and files that import the target."""
+    if hasattr(memory, "path"):
+        graph = get_import_graph(memory.path)
+    else:
+        graph = ImportGraph.from_memory(memory)
+    return graph.neighbours(target)
+
+
+def rank_entries(memory, query, target=None):
+    """Returns [(path, score)] ordered by BM25 relevance to the query plus graph proximity."""
+    items = list(memory.items())
+    if not items:
+        return []
+
+    docs = [(path, Counter(_entry_terms(path, entry))) for path, entry in items]
+    avg_len = sum(sum(tf.values()) for _, tf in docs) / len(docs) or 1
+    df = Counter()
+    for _, tf in docs:
+        df.update(tf.keys())
+
+    query_terms = set(tokenize(query))
+    n = len(docs)
+    scores = {}
+    for path, tf in docs:
+        length = sum(tf.values())
+        score = 0.0
+        for term in query_terms:
+            freq = tf.get(term)
+            if not freq:
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * freq * (BM25_K1 + 1) / (freq + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+        scores[path] = score
+
+    if target:
+        best = max(scores.values(), default=0) or 1.0
+        for path in _neighbours(memory, target):
+            scores[path] += best * NEIGHBOUR_BOOST
+        if target in scores:
+            scores[target] = float("inf")
+
+    ranked = [(path, score) for path, score in scores.items() if score > 0]
+    ranked.sort(key=lambda item: item[1], reverse=True)
+    return ranked
+
+
+def _prompt_entry(entry):
+    # Symbol rows (spans, doc hashes, call lists) are for tools, not prompts; the names stay
+    if isinstance(entry, dict) and "symbols" in entry:
+        return {key: value for key, value in entry.items() if key != "symbols"}
+    return entry
+
+
+def select_context(memory, query, target=None, budget_tokens=TOKEN_BUDGET):
+    """
+    Picks the memory entries most relevant to `query` (and to `target`,
+    if given) that fit in `budget_tokens`, most relevant first.
+    """
+    if target:
+        target = canonical_key(target)
+    selected, used = {}, 0
+    budget_chars = budget_tokens * CHARS_PER_TOKEN
+    for path, _ in rank_entries(memory, query, target):
+        entry = _prompt_entry(memory[path])
+        cost = len(path) + len(json.dumps(entry)) + 8
+        if used + cost > budget_chars:
+            continue
+        selected[path] = entry
+        used += cost
+    return selected
@@ -0,0 +1,224 @@
+import os
+import sys
+import threading
+from collections import defaultdict, deque
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.memory_store import get_store, canonical_key
+
+
+def module_name(path):
+    """deepseek/modules/foo.py -> deepseek.modules.foo"""
+    stem = os.path.splitext(os.path.normpath(path))[0]
+    return stem.replace(os.sep, ".").strip(".")
+
+
+def _suffixes(module):
+    """a.b.c -> c, b.c, a.b.c: every name a sys.path-style import could use for the file."""
+    parts = module.split(".")
+    return [".".join(parts[i:]) for i in range(len(parts))]
+
+
+def import_targets(path, statement):
+    """
+    Module names one import line may refer to, as a list of alternatives
+    per imported thing (most specific first): "from a import b" could be
+    the module a.b or the name b inside a.
+    """
+    statement = statement.strip()
+    if statement.startswith("from "):
+        module, _, names = statement[5:].partition(" import ")
+        module = module.strip()
+        level = len(module) - len(module.lstrip("."))
+        if level:
+            package = module_name(path).split(".")[:-level]
+            module = ".".join(package + ([module.lstrip(".")] if module.lstrip(".") else []))
+        names = [n.strip().split(" as ")[0].strip() for n in names.strip("() ").split(",")]
+        targets = [[f"{module}.{name}", module] if module else [name] for name in names if name and name != "*"]
+        return targets or [[module]]
+    if statement.startswith("import "):
+        names = statement[7:].split(",")
+        return [[name.strip().split(" as ")[0].strip()] for name in names if name.strip()]
+    # MemoryBuilder used to store bare module names
+    return [[statement]] if statement else []
+
+
+class ImportGraph:
+    """
+    Which indexed files import which, computed from the imports recorded in
+    the code memory. Keeps forward and reverse adjacency, answers transitive
+    queries ("what does X pull in", "what breaks if X changes") and is
+    updated per file by sync(), so an edit only re-resolves the files it
+    can affect.
+    """
+
+    def __init__(self):
+        self.forward = defaultdict(set)  # path -> files it imports
+        self.reverse = defaultdict(set)  # path -> files importing it
+        self._imports = {}  # path -> tuple of import lines last seen
+        self._targets = {}  # path -> [[alternative module names], ...]
+        self._by_suffix = defaultdict(set)  # dotted suffix -> paths it can name
+        self._wanted = defaultdict(set)  # module name -> paths importing it
+        self._closures = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_memory(cls, memory):
+        graph = cls()
+        graph.sync(memory)
+        return graph
+
+    def sync(self, memory):
+        """Applies the memory's current imports; returns the paths whose edges were recomputed."""
+        with self._lock:
+            current = {path: tuple(entry.get("imports", [])) for path, entry in memory.items()
+                       if isinstance(entry, dict)}
+            for path in [p for p in self._imports if p not in current]:
+                self._remove(path)
+            touched = set()
+            for path, imports in current.items():
+                if self._imports.get(path) != imports:
+                    touched |= self._set(path, imports)
+            if touched:
+                self._closures.clear()
+            return touched
+
+    def _set(self, path, imports):
+        is_new = path not in self._imports
+        for alternatives in self._targets.get(path, []):
+            for target in alternatives:
+                self._wanted[target].discard(path)
+        self._imports[path] = imports
+        self._targets[path] = [alts for statement in imports for alts in import_targets(path, statement)]
+        for alternatives in self._targets[path]:
+            for target in alternatives:
+                self._wanted[target].add(path)
+
+        touched = {path}
+        if is_new:
+            # The new file may satisfy imports that resolved to nothing (or elsewhere) before
+            for suffix in _suffixes(module_name(path)):
+                self._by_suffix[suffix].add(path)
+                touched |= self._wanted.get(suffix, set())
+        for other in touched:
+            self._resolve(other)
+        return touched
+
+    def _remove(self, path):
+        importers = set(self.reverse.get(path, ()))
+        for alternatives in self._targets.pop(path, []):
+            for target in alternatives:
+                self._wanted[target].discard(path)
+        for suffix in _suffixes(module_name(path)):
+            self._by_suffix[suffix].discard(path)
+        for dependency in self.forward.pop(path, set()):
+            self.reverse[dependency].discard(path)
+        self.reverse.pop(path, None)
+        self._imports.pop(path, None)
+        for other in importers:
+            self._resolve(other)
+        self._closures.clear()
+
+    def _lookup(self, path, target):
+        candidates = self._by_suffix.get(target, set()) - {path}
+        if len(candidates) <= 1:
+            return candidates
+        # Several files share the name: prefer the ones nearest the importer
+        here = os.path.dirname(path).split(os.sep)
+
+        def shared(candidate):
+            there = os.path.dirname(candidate).split(os.sep)
+            n = 0
+            while n < min(len(here), len(there)) and here[n] == there[n]:
+                n += 1
+            return n
+
+        best = max(shared(c) for c in candidates)
+        return {c for c in candidates if shared(c) == best}
+
+    def _resolve(self, path):
+        found = set()
+        for alternatives in self._targets.get(path, []):
+            for target in alternatives:
+                matches = self._lookup(path, target)
+                if matches:
+                    found |= matches
+                    break
+        old = self.forward.get(path, set())
+        for dependency in old - found:
+            self.reverse[dependency].discard(path)
+        for dependency in found - old:
+            self.reverse[dependency].add(path)
+        self.forward[path] = found
+
+    def _closure(self, start, adjacency, kind):
+        key = (kind, start)
+        if key not in self._closures:
+            seen, queue = set(), deque([start])
+            while queue:
+                for nxt in adjacency.get(queue.popleft(), ()):
+                    if nxt not in seen and nxt != start:
+                        seen.add(nxt)
+                        queue.append(nxt)
+            self._closures[key] = frozenset(seen)
+        return self._closures[key]
+
+    def dependencies(self, path, transitive=False):
+        """Files `path` imports (and, transitively, what those import)."""
+        path = canonical_key(path)
+        with self._lock:
+            if transitive:
+                return set(self._closure(path, self.forward, "forward"))
+            return set(self.forward.get(path, ()))
+
+    def dependents(self, path, transitive=False):
+        """Files importing `path` (and, transitively, their importers)."""
+        path = canonical_key(path)
+        with self._lock:
+            if transitive:
+                return set(self._closure(path, self.reverse, "reverse"))
+            return set(self.reverse.get(path, ()))
+
+    def neighbours(self, path):
+        """Direct imports plus direct importers."""
+        return self.dependencies(path) | self.dependents(path)
+
+    def affected(self, paths):
+        """The changed files plus every file that imports one of them, directly or not."""
+        result = set()
+        for path in paths:
+            path = canonical_key(path)
+            result.add(path)
+            result |= self.dependents(path, transitive=True)
+        return result
+
+    def to_code_map(self):
+        """{path: {"depends_on": [...], "used_by": [...]}} in the shape of code_map.json."""
+        with self._lock:
+            return {
+                path: {"depends_on": sorted(self.forward.get(path, ())), "used_by": sorted(self.reverse.get(path, ()))}
+                for path in sorted(self._imports)
+            }
+
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def get_import_graph(memory_path="deepseek/memory/code_memory.json") -> ImportGraph:
+    """Returns the shared graph for this memory file, synced with its current contents."""
+    key = os.path.abspath(memory_path)
+    with _graphs_lock:
+        graph = _graphs.get(key)
+        if graph is None:
+            graph = _graphs[key] = ImportGraph()
+    graph.sync(get_store(key))
+    return graph
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python import_graph.py <code_memory.json> <changed file> [...]")
+    else:
+        for affected_path in sorted(get_import_graph(sys.argv[1]).affected(sys.argv[2:])):
+            print(affected_path)
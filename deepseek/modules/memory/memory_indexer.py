@@ -1,59 +1,139 @@
 import os
-import ast
-import json
+import sys
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.memory_store import get_store, canonical_key
+from memory.symbol_index import extract_symbols
+from memory.import_graph import get_import_graph
+
+SKIP_DIRS = {".git", "__pycache__", ".venv", "venv", "node_modules", "processed"}
+PARALLEL_THRESHOLD = 16  # below this many changed files, parsing in-process is faster
+
+
+def index_file(filepath, known_hash=None):
+    """
+    Hashes one file and parses it only if the hash changed.
+    Module-level so it can run in a worker process.
+    Returns (hash, entry); entry is None when the content is unchanged.
+    """
+    with open(filepath, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()
+    if digest == known_hash:
+        return digest, None
+    return digest, extract_symbols(raw.decode("utf-8", errors="replace"))
+
+
+def _safe_index(job):
+    try:
+        return index_file(*job)
+    except Exception as e:
+        return e
+
 
 class MemoryBuilder:
-    def __init__(self, base_path="deepseek", memory_path="deepseek/memory/code_memory.json"):
+    """
+    Indexes every .py file under base_path into the code memory.
+    Keeps per-file mtime/size/hash in a sidecar state file so later runs
+    only re-parse files that actually changed and drop deleted ones.
+    """
+
+    def __init__(self, base_path="deepseek", memory_path="deepseek/memory/code_memory.json",
+                 key_root=None, workers=None, state_path=None):
         self.base_path = base_path
         self.memory_path = memory_path
-        self.memory = {}
+        self.key_root = key_root
+        self.workers = workers
+        self.state_path = state_path or os.path.splitext(memory_path)[0] + ".state.json"
+        self.memory = get_store(memory_path)
+        self.state = get_store(self.state_path)
 
-    def build(self):
-        for root, _, files in os.walk(self.base_path):
+    def _key_for(self, full_path):
+        return canonical_key(full_path, self.key_root)
+
+    def _walk(self):
+        for root, dirs, files in os.walk(self.base_path):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
             for file in files:
                 if file.endswith(".py"):
-                    full_path = os.path.join(root, file)
-                    self.memory[full_path] = self._analyze_file(full_path)
+                    yield os.path.join(root, file)
+
+    def build(self, full=False):
+        """
+        Brings the memory up to date and returns what changed, plus the
+        files affected by it (changed files and everything importing them).
+        full=True ignores the saved state and re-parses everything.
+        """
+        graph = get_import_graph(self.memory_path)
+        seen = set()
+        candidates = []
+        stamps = {}
+
+        for full_path in self._walk():
+            key = self._key_for(full_path)
+            seen.add(key)
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                continue
+            stamp = [st.st_mtime_ns, st.st_size]
+            known = None if full else self.state.get(key)
+            if known and known.get("stamp") == stamp and key in self.memory:
+                continue
+            stamps[key] = stamp
+            candidates.append((key, full_path, known.get("hash") if known else None))
+
+        changed, new_state = {}, {}
+        for (key, full_path, _), outcome in zip(candidates, self._index_all(candidates)):
+            if isinstance(outcome, Exception):
+                print(f"⚠️ Could not read {full_path}: {outcome}")
+                continue
+            digest, entry = outcome
+            new_state[key] = {"stamp": stamps[key], "hash": digest}
+            if entry is not None or key not in self.memory:
+                changed[key] = entry if entry is not None else index_file(full_path)[1]
 
+        removed = [key for key in self.state.keys() if key not in seen]
+        # Importers of deleted files must be looked up before the edges go away
+        affected = graph.affected(removed)
+
+        if changed:
+            self.memory.update_many(changed)
+        if new_state:
+            self.state.update_many(new_state)
+        if removed:
+            self.memory.delete_many(removed)
+            self.state.delete_many(removed)
         self._save_memory()
 
+        graph.sync(self.memory)
+        affected = (affected | graph.affected(changed)) - set(removed)
+        return {"changed": sorted(changed), "removed": sorted(removed), "affected": sorted(affected),
+                "scanned": len(seen)}
+
+    def _index_all(self, candidates):
+        jobs = [(full_path, known_hash) for _, full_path, known_hash in candidates]
+        if len(jobs) < PARALLEL_THRESHOLD or (self.workers or os.cpu_count() or 1) == 1:
+            return [_safe_index(job) for job in jobs]
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # Chunking keeps IPC overhead low when thousands of small files changed
+            chunksize = max(1, len(jobs) // (pool._max_workers * 4))
+            return list(pool.map(_safe_index, jobs, chunksize=chunksize))
+
     def _analyze_file(self, filepath):
         with open(filepath, "r", encoding="utf-8") as f:
-            source = f.read()
-
-        try:
-            tree = ast.parse(source)
-        except SyntaxError:
-            return {"error": "Syntax error in file"}
-
-        functions = []
-        classes = []
-        imports = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                functions.append(node.name)
-            elif isinstance(node, ast.ClassDef):
-                classes.append(node.name)
-            elif isinstance(node, ast.Import):
-                imports.extend([alias.name for alias in node.names])
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module if node.module else ""
-                imports.append(module)
-
-        return {
-            "functions": functions,
-            "classes": classes,
-            "imports": list(set(imports))  # remove duplicates
-        }
+            return extract_symbols(f.read())
 
     def _save_memory(self):
-        os.makedirs(os.path.dirname(self.memory_path), exist_ok=True)
-        with open(self.memory_path, "w", encoding="utf-8") as f:
-            json.dump(self.memory, f, indent=2)
+        self.memory.flush()
+        self.state.flush()
 
 # Optional test run
 if __name__ == "__main__":
     builder = MemoryBuilder()
-    builder.build()
-    print("Memory has been built and saved.")
+    summary = builder.build()
+    print(f"Memory has been built and saved. {len(summary['changed'])} changed, "
+          f"{len(summary['removed'])} removed, {summary['scanned']} scanned.")
@@ -1,32 +1,57 @@
 import os
-import json
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from memory.memory_store import get_store
+from memory.memory_sqlite import SQLiteMemory, import_modules
 
 MEMORY_FILE = "code_memory.json"
+SQLITE_FILE = "code_memory.db"
+MEMORY_BACKEND = "json"  # "json" or "sqlite"
+
+_sqlite_memory = None
+
+def _sqlite():
+    global _sqlite_memory
+    if _sqlite_memory is None:
+        _sqlite_memory = SQLiteMemory(SQLITE_FILE)
+    return _sqlite_memory
 
 def load_memory():
-    if not os.path.exists(MEMORY_FILE):
-        return {}
-    with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    if MEMORY_BACKEND == "sqlite":
+        return _sqlite().load_memory()
+    return get_store(MEMORY_FILE)
 
 def save_memory(memory_data):
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(memory_data, f, indent=4)
+    if MEMORY_BACKEND == "sqlite":
+        _sqlite().save_memory(memory_data)
+        return
+    store = load_memory()
+    if memory_data is not store:
+        store.replace_all(memory_data)
+    store.save()
 
 def update_memory(file_path, new_structure):
-    memory = load_memory()
-    memory[file_path] = new_structure
-    save_memory(memory)
+    if MEMORY_BACKEND == "sqlite":
+        _sqlite().update_memory(file_path, new_structure)
+        return
+    load_memory()[file_path] = new_structure
 
 def get_file_structure(file_path):
+    if MEMORY_BACKEND == "sqlite":
+        return _sqlite().get_file_structure(file_path)
     memory = load_memory()
     return memory.get(file_path, {})
 
 def list_all_files():
+    if MEMORY_BACKEND == "sqlite":
+        return _sqlite().list_all_files()
     memory = load_memory()
-    return list(memory.keys())
+    return memory.keys()
 
 def list_all_classes():
+    if MEMORY_BACKEND == "sqlite":
+        return _sqlite().list_all_classes()
     memory = load_memory()
     return {
         file: data.get("classes", [])
@@ -34,8 +59,30 @@ def list_all_classes():
     }
 
 def list_all_functions():
+    if MEMORY_BACKEND == "sqlite":
+        return _sqlite().list_all_functions()
     memory = load_memory()
     return {
         file: data.get("functions", [])
         for file, data in memory.items()
     }
+
+def files_defining(name):
+    """Which files define a class or function called `name`."""
+    if MEMORY_BACKEND == "sqlite":
+        return _sqlite().files_defining(name)
+    return [
+        file for file, data in load_memory().items()
+        if name in data.get("classes", []) or name in data.get("functions", [])
+    ]
+
+def files_importing(module):
+    """Which files import `module` (or one of its submodules)."""
+    if MEMORY_BACKEND == "sqlite":
+        return _sqlite().files_importing(module)
+    return [
+        file for file, data in load_memory().items()
+        if any(m == module or m.startswith(module + ".")
+               for statement in data.get("imports", [])
+               for m in import_modules(statement))
+    ]
@@ -0,0 +1,192 @@
+import os
+import json
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    module TEXT NOT NULL,
+    statement TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_id);
+CREATE INDEX IF NOT EXISTS idx_imports_module ON imports(module);
+CREATE INDEX IF NOT EXISTS idx_imports_file ON imports(file_id);
+"""
+
+SYMBOL_KINDS = {"classes": "class", "functions": "function"}
+
+
+def import_modules(statement):
+    """
+    Turns one memory import entry into module names.
+    Handles full lines ("from a.b import c", "import x, y as z")
+    as well as the bare names MemoryBuilder stores ("a.b").
+    """
+    statement = statement.strip()
+    if statement.startswith("from "):
+        module = statement[5:].split(" import ", 1)[0].strip()
+        return [module] if module else []
+    if statement.startswith("import "):
+        names = statement[7:].split(",")
+        return [name.strip().split(" as ")[0].strip() for name in names if name.strip()]
+    return [statement] if statement else []
+
+
+class SQLiteMemory:
+    """
+    Code memory kept in SQLite instead of one flat JSON dict.
+    Offers the same calls as memory_manager, plus indexed lookups
+    like files_defining("Foo") and files_importing("requests").
+    """
+
+    def __init__(self, db_path="code_memory.db"):
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _put(self, file_path, structure):
+        self._conn.execute(
+            "INSERT INTO files(path, data) VALUES (?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET data = excluded.data",
+            (file_path, json.dumps(structure)),
+        )
+        file_id = self._conn.execute("SELECT id FROM files WHERE path = ?", (file_path,)).fetchone()[0]
+        self._conn.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
+        self._conn.execute("DELETE FROM imports WHERE file_id = ?", (file_id,))
+
+        symbols = [
+            (file_id, name, kind)
+            for key, kind in SYMBOL_KINDS.items()
+            for name in structure.get(key, [])
+        ]
+        imports = [
+            (file_id, module, statement)
+            for statement in structure.get("imports", [])
+            for module in import_modules(statement)
+        ]
+        self._conn.executemany("INSERT INTO symbols(file_id, name, kind) VALUES (?, ?, ?)", symbols)
+        self._conn.executemany("INSERT INTO imports(file_id, module, statement) VALUES (?, ?, ?)", imports)
+
+    # -- memory_manager API ------------------------------------------------
+
+    def load_memory(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT path, data FROM files").fetchall()
+        return {path: json.loads(data) for path, data in rows}
+
+    def save_memory(self, memory_data):
+        """Replaces the whole memory in one transaction."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files")
+            for file_path, structure in memory_data.items():
+                self._put(file_path, structure)
+
+    def update_memory(self, file_path, new_structure):
+        with self._lock, self._conn:
+            self._put(file_path, new_structure)
+
+    def update_many(self, entries):
+        with self._lock, self._conn:
+            for file_path, structure in entries.items():
+                self._put(file_path, structure)
+
+    def delete_file(self, file_path):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (file_path,))
+
+    def get_file_structure(self, file_path):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM files WHERE path = ?", (file_path,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def list_all_files(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT path FROM files ORDER BY id")]
+
+    def _list_symbols(self, kind):
+        with self._lock:
+            files = [row[0] for row in self._conn.execute("SELECT path FROM files ORDER BY id")]
+            rows = self._conn.execute(
+                "SELECT f.path, s.name FROM symbols s JOIN files f ON f.id = s.file_id "
+                "WHERE s.kind = ? ORDER BY s.rowid",
+                (kind,),
+            ).fetchall()
+        result = {path: [] for path in files}
+        for path, name in rows:
+            result[path].append(name)
+        return result
+
+    def list_all_classes(self):
+        return self._list_symbols("class")
+
+    def list_all_functions(self):
+        return self._list_symbols("function")
+
+    # -- indexed queries ---------------------------------------------------
+
+    def files_defining(self, name, kind=None):
+        """Files that define a class or function called `name`."""
+        query = ("SELECT DISTINCT f.path FROM symbols s JOIN files f ON f.id = s.file_id "
+                 "WHERE s.name = ?")
+        params = [name]
+        if kind:
+            query += " AND s.kind = ?"
+            params.append(SYMBOL_KINDS.get(kind, kind))
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def files_importing(self, module):
+        """Files importing `module` or any of its submodules."""
+        # The range condition keeps the submodule match on the index, unlike LIKE
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT f.path FROM imports i JOIN files f ON f.id = i.file_id "
+                "WHERE i.module = ? OR (i.module >= ? AND i.module < ?)",
+                (module, module + ".", module + "/"),
+            )
+            return [row[0] for row in rows]
+
+
+def migrate_from_json(json_path, db_path):
+    """One-shot copy of an existing code_memory.json into a SQLite memory."""
+    memory = {}
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        if text.strip():
+            memory = json.loads(text)
+
+    db = SQLiteMemory(db_path)
+    db.save_memory(memory)
+    print(f"✅ Migrated {len(memory)} files from {json_path} to {db_path}")
+    return db
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 3:
+        print("Usage: python memory_sqlite.py <code_memory.json> <code_memory.db>")
+    else:
+        migrate_from_json(sys.argv[1], sys.argv[2]).close()
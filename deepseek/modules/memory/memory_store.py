@@ -0,0 +1,246 @@
+import os
+import json
+import atexit
+import tempfile
+import threading
+from collections.abc import MutableMapping
+
+FLUSH_DELAY = 0.5  # seconds to wait for more edits before writing
+
+
+class MemoryStore(MutableMapping):
+    """
+    Shared in-process view of a code memory JSON file.
+
+    Reads come from an in-memory dict that is only reloaded when the file's
+    mtime/size changes on disk. Writes touch a single entry, mark it dirty
+    and schedule a debounced flush, which rewrites the file atomically
+    (temp file + rename). All access is guarded by one lock.
+    """
+
+    def __init__(self, path, flush_delay=FLUSH_DELAY):
+        self.path = os.path.abspath(path)
+        self.flush_delay = flush_delay
+        self._data = {}
+        self._stamp = None
+        self._dirty = set()
+        self._deleted = set()
+        self._timer = None
+        self._lock = threading.RLock()
+        self._refresh()
+
+    # -- disk sync ---------------------------------------------------------
+
+    def _disk_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read_disk(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return {}
+        if not text.strip():
+            return {}
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Memory file is corrupt, starting empty: {self.path} ({e})")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _refresh(self):
+        stamp = self._disk_stamp()
+        if stamp == self._stamp:
+            return
+        data = self._read_disk()
+        # Someone else rewrote the file: keep their entries but replay ours on top
+        for key in self._dirty:
+            data[key] = self._data[key]
+        for key in self._deleted:
+            data.pop(key, None)
+        self._data = data
+        self._stamp = stamp
+
+    def flush(self):
+        """Writes pending changes now. Safe to call when nothing is dirty."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty and not self._deleted:
+                return
+            self._refresh()
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".code_memory.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, separators=(",", ":"))
+                    f.flush()
+                    os.fsync(f.fileno())
+                # mkstemp creates files 0600; keep the mode the file had, or the usual 0644
+                try:
+                    os.chmod(tmp_path, os.stat(self.path).st_mode & 0o7777)
+                except FileNotFoundError:
+                    os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            self._stamp = self._disk_stamp()
+            self._dirty.clear()
+            self._deleted.clear()
+
+    def save(self):
+        """Schedules a flush after FLUSH_DELAY so bursts of edits share one write."""
+        with self._lock:
+            if self._timer is not None or (not self._dirty and not self._deleted):
+                return
+            if self.flush_delay <= 0:
+                self.flush()
+                return
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # -- mapping API -------------------------------------------------------
+
+    def __getitem__(self, key):
+        with self._lock:
+            self._refresh()
+            return self._data[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._refresh()
+            self._data[key] = value
+            self._dirty.add(key)
+            self._deleted.discard(key)
+        self.save()
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._refresh()
+            del self._data[key]
+            self._dirty.discard(key)
+            self._deleted.add(key)
+        self.save()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            self._refresh()
+            return key in self._data
+
+    def keys(self):
+        with self._lock:
+            self._refresh()
+            return list(self._data.keys())
+
+    def items(self):
+        with self._lock:
+            self._refresh()
+            return list(self._data.items())
+
+    def update_many(self, entries: dict):
+        """Sets several entries under one lock and one scheduled flush."""
+        with self._lock:
+            self._refresh()
+            for key, value in entries.items():
+                self._data[key] = value
+                self._dirty.add(key)
+                self._deleted.discard(key)
+        self.save()
+
+    def delete_many(self, keys):
+        """Removes several entries; missing keys are ignored."""
+        with self._lock:
+            self._refresh()
+            for key in keys:
+                if key in self._data:
+                    del self._data[key]
+                    self._dirty.discard(key)
+                    self._deleted.add(key)
+        self.save()
+
+    def rename_many(self, renames: dict):
+        """Moves entries from old keys to new keys under one lock; missing keys are ignored."""
+        with self._lock:
+            self._refresh()
+            moved = {old: self._data.pop(old) for old in renames if old in self._data}
+            for old, value in moved.items():
+                new = renames[old]
+                self._data[new] = value
+                self._dirty.discard(old)
+                self._deleted.add(old)
+                self._dirty.add(new)
+                self._deleted.discard(new)
+        self.save()
+        return len(moved)
+
+    def replace_all(self, entries: dict):
+        """Swaps in a whole new memory, e.g. after a full rebuild."""
+        with self._lock:
+            self._refresh()
+            self._deleted.update(set(self._data) - set(entries))
+            self._data = dict(entries)
+            self._dirty = set(entries)
+        self.save()
+
+    def snapshot(self) -> dict:
+        """Shallow copy of the current memory, e.g. for building prompts."""
+        with self._lock:
+            self._refresh()
+            return dict(self._data)
+
+
+def canonical_key(path, root=None):
+    """
+    The key a file has in every memory: its normalised path relative to
+    `root` (the working directory by default), or the absolute path if it
+    lives outside it. Absolute and relative spellings of one file agree.
+    """
+    full = os.path.abspath(path)
+    try:
+        relative = os.path.relpath(full, os.path.abspath(root or os.getcwd()))
+    except ValueError:  # another drive on Windows
+        return full
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return full
+    return relative
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path) -> MemoryStore:
+    """Returns the one shared MemoryStore for this file path."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = MemoryStore(key)
+            _stores[key] = store
+        return store
+
+
+@atexit.register
+def flush_all():
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.flush()
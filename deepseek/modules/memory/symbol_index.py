@@ -0,0 +1,122 @@
+# symbol_index.py
+import ast
+import hashlib
+
+# Fields of each row in an entry's "symbols" list (kept as lists so the memory JSON stays small)
+SYMBOL_FIELDS = ("kind", "qualname", "start", "end", "signature", "doc_hash", "calls")
+
+
+def _doc_hash(node):
+    doc = ast.get_docstring(node)
+    return hashlib.sha1(doc.encode("utf-8")).hexdigest()[:12] if doc else None
+
+
+def _signature(node):
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(base) for base in node.bases]
+        return f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+
+def _calls(node):
+    """Names called in this definition's own body (nested definitions are their own symbols)."""
+    found = set()
+    stack = list(node.body)
+    while stack:
+        child = stack.pop()
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        if isinstance(child, ast.Call) and isinstance(child.func, (ast.Name, ast.Attribute)):
+            try:
+                found.add(ast.unparse(child.func))
+            except Exception:
+                pass
+        stack.extend(ast.iter_child_nodes(child))
+    return sorted(found)
+
+
+def _import_statement(node):
+    names = ", ".join(alias.name + (f" as {alias.asname}" if alias.asname else "") for alias in node.names)
+    if isinstance(node, ast.Import):
+        return f"import {names}"
+    return f"from {'.' * node.level}{node.module or ''} import {names}"
+
+
+def extract_symbols(source):
+    """
+    Parses Python source once and returns its memory entry:
+    classes, functions and imports (as before) plus "symbols", one row per
+    class/function/method (nested ones included) with kind, qualified name,
+    line span, signature, docstring hash and the names it calls.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return {"error": "Syntax error in file"}
+
+    classes, functions, imports, symbols = [], [], [], []
+
+    def visit(node, prefix, in_class):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.Import, ast.ImportFrom)):
+                statement = _import_statement(child)
+                if statement not in imports:
+                    imports.append(statement)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                qualname = prefix + child.name
+                if isinstance(child, ast.ClassDef):
+                    kind = "class"
+                    classes.append(child.name)
+                else:
+                    kind = "method" if in_class else "function"
+                    functions.append(child.name)
+                start = min([d.lineno for d in child.decorator_list] + [child.lineno])
+                symbols.append([kind, qualname, start, child.end_lineno, _signature(child),
+                                _doc_hash(child), _calls(child)])
+                visit(child, qualname + ".", isinstance(child, ast.ClassDef))
+            else:
+                visit(child, prefix, in_class)
+
+    visit(tree, "", False)
+    return {
+        "classes": classes,
+        "functions": functions,
+        "imports": imports,
+        "symbols": symbols,
+    }
+
+
+def iter_symbols(entry):
+    """Yields each symbol of a memory entry as a dict keyed by SYMBOL_FIELDS."""
+    for row in entry.get("symbols", []):
+        yield dict(zip(SYMBOL_FIELDS, row))
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip())
+
+
+def _span_matches(lines, symbol):
+    """Cheap staleness check: the span opens with this symbol's def/class line and its block ends where stored."""
+    start, end = symbol["start"], symbol["end"]
+    if end > len(lines) or not lines[end - 1].strip():
+        return False
+    name = symbol["qualname"].rsplit(".", 1)[-1]
+    head = lines[start - 1:end][:10]  # decorators come first
+    if not any(line.lstrip().startswith(("def " + name, "async def " + name, "class " + name)) for line in head):
+        return False
+    following = next((line for line in lines[end:] if line.strip()), None)
+    return following is None or _indent(following) <= _indent(lines[start - 1])
+
+
+def current_entry(source, entry=None):
+    """
+    The memory entry for `source`: the stored one while its symbol spans
+    still match the source, otherwise freshly extracted.
+    """
+    lines = source.splitlines()
+    if entry and entry.get("symbols") and all(_span_matches(lines, symbol) for symbol in iter_symbols(entry)):
+        return entry
+    return extract_symbols(source)
@@ -0,0 +1,152 @@
+# ollama_client.py
+
+import io
+import os
+import sys
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from response_cache import ResponseCache, make_key
+
+OLLAMA_URL = "http://localhost:11434"
+DEFAULT_MODEL = "deepseek-coder"
+CONNECT_TIMEOUT = 5  # seconds to open a connection
+READ_TIMEOUT = 300  # seconds to wait between streamed chunks
+MAX_RETRIES = 3
+POOL_SIZE = 8
+CACHE_ENABLED = True  # reuse stored responses for byte-identical requests
+
+
+class OllamaError(RuntimeError):
+    """Raised when the model server returns an error instead of tokens."""
+
+
+class OllamaClient:
+    """
+    Thin client for Ollama's /api/generate endpoint.
+    One instance keeps a pooled keep-alive Session, so every caller
+    reuses the same sockets instead of opening a fresh connection.
+    """
+
+    def __init__(self,
+                 base_url: str = OLLAMA_URL,
+                 model: str = DEFAULT_MODEL,
+                 connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT,
+                 retries: int = MAX_RETRIES,
+                 pool_size: int = POOL_SIZE,
+                 cache: ResponseCache = None):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.cache = cache
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+
+        # Only connection-level failures and 5xx are retried; once tokens
+        # start flowing a broken stream is surfaced to the caller.
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def stream_tokens(self, prompt: str, model: str = None, options: dict = None, use_cache: bool = True):
+        """
+        Yields response tokens one by one as Ollama streams them.
+        A cache hit is yielded as a single token; a completed miss is stored.
+        """
+        model = model or self.model
+        if self.cache is None or not use_cache:
+            yield from self._stream(prompt, model, options)
+            return
+
+        key = make_key(model, prompt, options)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        tokens = []
+        for token in self._stream(prompt, model, options):
+            tokens.append(token)
+            yield token
+        self.cache.put(key, model, "".join(tokens))
+
+    def _stream(self, prompt, model, options):
+        payload = {"model": model, "prompt": prompt, "stream": True}
+        if options:
+            payload["options"] = options
+
+        with self.session.post(f"{self.base_url}/api/generate",
+                               json=payload, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise OllamaError(chunk["error"])
+                token = chunk.get("response", "")
+                if token:
+                    yield token
+
+    def generate(self, prompt: str, model: str = None, options: dict = None, use_cache: bool = True) -> str:
+        """Collects the full streamed response into a single string."""
+        buffer = io.StringIO()
+        for token in self.stream_tokens(prompt, model=model, options=options, use_cache=use_cache):
+            buffer.write(token)
+        return buffer.getvalue()
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> OllamaClient:
+    """Returns the shared process-wide client so all modules share one pool."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = OllamaClient(cache=ResponseCache() if CACHE_ENABLED else None)
+        return _default_client
+
+
+def set_client(client: OllamaClient):
+    """Replaces the shared client, e.g. to point at another host or a fake server."""
+    global _default_client
+    with _default_lock:
+        _default_client = client
+
+
+def strip_code_fences(text):
+    """Returns the code inside a ```fenced``` reply, or the reply itself if it has no fences."""
+    lines = text.strip().splitlines()
+    if not lines or not lines[0].startswith("```"):
+        return text
+    body = []
+    for line in lines[1:]:
+        if line.startswith("```"):
+            break
+        body.append(line)
+    return "\n".join(body) + "\n"
+
+
+def query_deepseek(prompt, model=DEFAULT_MODEL, use_cache=True):
+    """Drop-in replacement for the old per-module query_deepseek helpers."""
+    return get_client().generate(prompt, model=model, use_cache=use_cache)
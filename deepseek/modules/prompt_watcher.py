@@ -0,0 +1,206 @@
+# prompt_watcher.py
+
+import os
+import sys
+import queue
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+
+POLL_INTERVAL = 3  # seconds, only used when inotify isn't available
+WORKERS = 4
+QUEUE_SIZE = 64  # pending prompts held in memory before the watcher waits
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal ctypes wrapper around Linux inotify for one directory."""
+
+    def __init__(self, path):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+
+    def read(self, timeout):
+        """
+        Waits up to `timeout` seconds and returns the file names that were
+        written or moved in. Returns None if the kernel queue overflowed,
+        meaning the caller should rescan the directory.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        names, offset = [], 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                return None
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PromptWatcher:
+    """
+    Watches a folder for prompt files and hands each one to `handler`
+    on a pool of worker threads.
+
+    The folder itself is the durable queue. A worker claims a prompt by
+    atomically renaming it into inflight/ before doing any work, so every
+    prompt is processed at most once even across crashes; it then moves to
+    processed/ (or failed/). Prompts left in inflight/ after a crash are
+    reported at start-up and not retried automatically.
+    """
+
+    def __init__(self, prompt_folder, handler, workers=WORKERS, queue_size=QUEUE_SIZE,
+                 suffix=".txt", poll_interval=POLL_INTERVAL):
+        self.prompt_dir = os.path.abspath(prompt_folder)
+        self.inflight_dir = os.path.join(self.prompt_dir, "inflight")
+        self.processed_dir = os.path.join(self.prompt_dir, "processed")
+        self.failed_dir = os.path.join(self.prompt_dir, "failed")
+        self.handler = handler
+        self.workers = workers
+        self.suffix = suffix
+        self.poll_interval = poll_interval
+        # Bounded, so a flood of prompts makes the watcher wait instead of buffering them all
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._queued = set()
+        self._queued_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+        for directory in (self.prompt_dir, self.inflight_dir, self.processed_dir, self.failed_dir):
+            os.makedirs(directory, exist_ok=True)
+
+    def _is_prompt(self, name):
+        return name.endswith(self.suffix) and os.path.isfile(os.path.join(self.prompt_dir, name))
+
+    def _scan(self):
+        with os.scandir(self.prompt_dir) as entries:
+            return sorted(e.name for e in entries if e.is_file() and e.name.endswith(self.suffix))
+
+    def _enqueue(self, name):
+        with self._queued_lock:
+            if name in self._queued:
+                return
+            self._queued.add(name)
+        while not self._stop.is_set():
+            try:
+                self.queue.put(name, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _watch(self):
+        try:
+            notifier = Inotify(self.prompt_dir)
+        except OSError as e:
+            print(f"⚠️ inotify unavailable ({e}), polling every {self.poll_interval}s instead.")
+            notifier = None
+
+        # Anything already waiting is picked up before new events
+        for name in self._scan():
+            self._enqueue(name)
+
+        try:
+            while not self._stop.is_set():
+                if notifier is None:
+                    self._stop.wait(self.poll_interval)
+                    names = self._scan()
+                else:
+                    names = notifier.read(timeout=0.5)
+                    if names is None:
+                        names = self._scan()
+                for name in names:
+                    if self._is_prompt(name):
+                        self._enqueue(name)
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+    def _claim(self, name):
+        """Moves the prompt into inflight/; returns None if another worker got it first."""
+        target = os.path.join(self.inflight_dir, name)
+        try:
+            os.rename(os.path.join(self.prompt_dir, name), target)
+        except FileNotFoundError:
+            return None
+        return target
+
+    def _work(self):
+        while True:
+            name = self.queue.get()
+            if name is None:
+                return
+            with self._queued_lock:
+                self._queued.discard(name)
+            path = self._claim(name)
+            if path is None:
+                continue
+            try:
+                self.handler(path)
+                os.replace(path, os.path.join(self.processed_dir, name))
+            except Exception as e:
+                print(f"❌ Failed to process prompt {name}: {e}")
+                os.replace(path, os.path.join(self.failed_dir, name))
+
+    def start(self):
+        stranded = os.listdir(self.inflight_dir)
+        if stranded:
+            print(f"⚠️ {len(stranded)} prompt(s) were in flight during a previous crash; see {self.inflight_dir}")
+
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._watch, name="prompt-watcher", daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._work, name=f"prompt-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stops watching, lets workers finish queued prompts, then joins them."""
+        self._stop.set()
+        self._threads[0].join()
+        for _ in range(self.workers):
+            self.queue.put(None)
+        for thread in self._threads[1:]:
+            thread.join()
+
+    def run_forever(self):
+        self.start()
+        try:
+            while True:
+                self._stop.wait(3600)
+        except KeyboardInterrupt:
+            print("👋 Stopping prompt watcher.")
+            self.stop()
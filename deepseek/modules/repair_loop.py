@@ -0,0 +1,142 @@
+# repair_loop.py
+
+import time
+import hashlib
+from sandbox import get_sandbox
+from file_writer import write_text
+from memory.memory_store import get_store, canonical_key
+from error.error_handler import smart_fix
+from error.fingerprint import fingerprint, get_learned_fixes
+
+RESULT_LOG = "deepseek/memory/smart_result_memory.json"
+MAX_ATTEMPTS = 3  # model fixes tried before giving up
+RUN_TIMEOUT = 10  # seconds per run
+
+
+def _hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _read(filepath):
+    with open(filepath, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _error_text(result):
+    return (result.get("error") or result.get("output") or result["status"]).strip()
+
+
+def _error_signature(result):
+    """Identity of a failure: its traceback fingerprint, so shifted line numbers still match."""
+    return fingerprint(_error_text(result))
+
+
+def _default_fixer(filepath, result):
+    stderr = (result.get("error") or "").strip()
+    error_entry = {
+        "error": stderr.splitlines()[-1] if stderr else result["status"],
+        "traceback": stderr,
+    }
+    return smart_fix(filepath, error_entry=error_entry)
+
+
+def repair_file(filepath, max_attempts=MAX_ATTEMPTS, runner=None, fixer=None, result_log=RESULT_LOG):
+    """
+    Runs `filepath` and, while it fails, asks the model for a fix and runs
+    it again, up to `max_attempts` fixes. Stops early when a traceback or
+    the code itself repeats, since another round would just cycle.
+
+    `runner(filepath)` returns a sandbox-style result dict and
+    `fixer(filepath, result)` rewrites the file and returns the new code;
+    both default to the sandbox and error_handler.smart_fix.
+    Per-attempt timings are recorded in smart_result_memory.json. When the
+    file ends up passing, the fixes that got it there are added to the
+    learned-fix index so the same error elsewhere is fixed without the model.
+    A learned fix that leaves the error in place is undone and forgotten,
+    and the model is asked instead.
+    """
+    runner = runner or (lambda path: get_sandbox().run(path, timeout=RUN_TIMEOUT))
+    fixer = fixer or _default_fixer
+
+    seen_errors = set()
+    code = _read(filepath)
+    seen_code = {_hash(code)}
+    fixes = []  # (traceback, code before, code after) per fix applied
+    last_signature = None
+    replayed = None  # hunks of the learned fix the last fixer call replayed, if it did
+    learned = get_learned_fixes()
+    history = []
+    stop_reason = "gave_up"
+
+    for attempt in range(max_attempts + 1):
+        start = time.perf_counter()
+        result = runner(filepath)
+        entry = {
+            "attempt": attempt,
+            "status": result["status"],
+            "run_seconds": round(time.perf_counter() - start, 3),
+        }
+        history.append(entry)
+
+        if result["status"] == "success":
+            stop_reason = "passed" if attempt == 0 else "fixed"
+            break
+
+        signature = _error_signature(result)
+        entry["error_hash"] = signature
+        if signature == last_signature and replayed:
+            # The learned fix didn't touch this error here: undo it, drop it, ask the model
+            traceback_text, before, _ = fixes.pop()
+            learned.forget(traceback_text, replayed)
+            write_text(filepath, before)
+            code = before
+            entry["replay_failed"] = True
+        elif signature in seen_errors:
+            stop_reason = "repeated_error"
+            break
+        seen_errors.add(signature)
+        last_signature = signature
+
+        if attempt == max_attempts:
+            break
+
+        replay, replay_hunks = learned.suggest(_error_text(result), code)
+        start = time.perf_counter()
+        new_code = fixer(filepath, result)
+        entry["fix_seconds"] = round(time.perf_counter() - start, 3)
+        if not new_code:
+            stop_reason = "no_fix"
+            break
+
+        code_hash = _hash(new_code)
+        entry["code_hash"] = code_hash
+        if code_hash in seen_code:
+            stop_reason = "repeated_code"
+            break
+        seen_code.add(code_hash)
+        fixes.append((_error_text(result), code, new_code))
+        replayed = replay_hunks if new_code == replay else None
+        code = new_code
+
+    summary = {
+        "status": result["status"],
+        "stop_reason": stop_reason,
+        "fix_attempts": sum(1 for entry in history if "fix_seconds" in entry),
+        "last_fixed": stop_reason == "fixed",
+        "history": history,
+    }
+    if result["status"] == "success":
+        for traceback_text, before, after in fixes:
+            learned.learn(traceback_text, before, after)
+        summary["output"] = result.get("output", "").strip()
+    else:
+        summary["error"] = (result.get("error") or result.get("output") or "").strip()
+
+    memory = get_store(result_log)
+    normalized = canonical_key(filepath)
+    previous = memory.get(normalized, {})
+    summary["attempts"] = previous.get("attempts", 0) + len(history)
+    memory[normalized] = summary
+
+    print(f"🔁 Repair of {filepath} finished: {stop_reason} after {summary['fix_attempts']} fix(es)")
+    return summary
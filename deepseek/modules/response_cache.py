@@ -0,0 +1,102 @@
+# response_cache.py
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+CACHE_PATH = "deepseek/memory/response_cache.db"
+MAX_ENTRIES = 5000
+TTL_SECONDS = 7 * 24 * 3600  # a week; None keeps entries until evicted
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed);
+"""
+
+
+def make_key(model, prompt, options=None) -> str:
+    """Content address of a generation request: hash of model, options and full prompt."""
+    payload = json.dumps({"model": model, "options": options or {}, "prompt": prompt},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk cache of model responses keyed by make_key().
+    Bounded to max_entries with least-recently-used eviction,
+    and entries older than ttl are treated as misses.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        """Returns the cached response, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            response, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count -= 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return response
+
+    def put(self, key, model, response):
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO responses(key, model, response, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            if cur.rowcount:
+                self._count += 1
+            else:
+                self._conn.execute(
+                    "UPDATE responses SET response = ?, created = ?, accessed = ? WHERE key = ?",
+                    (response, now, now, key),
+                )
+            if self._count > self.max_entries:
+                excess = self._count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                    (excess,),
+                )
+                self._count -= excess
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,198 @@
+# sandbox.py
+
+import os
+import sys
+import time
+import signal
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, runs are still timed and captured
+    resource = None
+
+SANDBOX_WORKERS = 4  # files run at the same time
+WALL_TIMEOUT = 15  # seconds per run
+CPU_LIMIT = 10  # CPU seconds per run
+MEMORY_LIMIT_MB = 1024  # address space per run
+FILE_SIZE_LIMIT_MB = 16  # largest file a run may write
+MAX_OUTPUT = 1024 * 1024  # characters of stdout/stderr kept per run
+
+
+# Sets the rlimits inside the child, then execs the real run in the same process,
+# so the limits carry over and the run itself is a plain `python file.py`.
+# (preexec_fn would do this between fork and exec, which isn't safe while the
+# parent has other threads, and runs here always start from worker threads.)
+_BOOTSTRAP = (
+    "import os, sys, resource\n"
+    "cpu, memory, size = (int(value) for value in sys.argv[1:4])\n"
+    "resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))\n"
+    "resource.setrlimit(resource.RLIMIT_AS, (memory, memory))\n"
+    "resource.setrlimit(resource.RLIMIT_FSIZE, (size, size))\n"
+    "os.execv(sys.executable, [sys.executable] + sys.argv[4:])\n"
+)
+
+
+def _limit_resources(cpu_seconds, memory_mb, file_size_mb):
+    """Returns a function that applies the rlimits to the current process (e.g. a forked child)."""
+    def apply():
+        if resource is None:
+            return
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        memory = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        size = file_size_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_FSIZE, (size, size))
+    return apply
+
+
+def _kill_session(process):
+    """Kills the run and anything it started in its session; without sessions (Windows), just the run."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _read_all(stream, sink):
+    # Read in chunks and keep only the first MAX_OUTPUT characters; the rest is
+    # drained and dropped so the child never blocks and we never buffer it all
+    kept = 0
+    while True:
+        chunk = stream.read(65536)
+        if not chunk:
+            break
+        if kept < MAX_OUTPUT:
+            chunk = chunk[:MAX_OUTPUT - kept]
+            sink.append(chunk)
+            kept += len(chunk)
+    stream.close()
+
+
+class Sandbox:
+    """
+    Runs Python files in separate, resource-limited processes.
+    Up to `workers` runs execute concurrently; each one gets CPU, memory
+    and file-size rlimits plus a wall-clock timeout, and reports its CPU
+    time and peak RSS alongside the captured output.
+    """
+
+    def __init__(self, workers=SANDBOX_WORKERS, wall_timeout=WALL_TIMEOUT, cpu_limit=CPU_LIMIT,
+                 memory_mb=MEMORY_LIMIT_MB, file_size_mb=FILE_SIZE_LIMIT_MB, python=sys.executable):
+        self.wall_timeout = wall_timeout
+        self.cpu_limit = cpu_limit
+        self.memory_mb = memory_mb
+        self.file_size_mb = file_size_mb
+        self.python = python
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sandbox")
+
+    def run(self, filepath, timeout=None, cwd=None) -> dict:
+        """
+        Runs one file and returns a dict with status (success, error,
+        timeout or exception), output, error, returncode, duration,
+        cpu_time and peak_rss_kb.
+        """
+        timeout = timeout or self.wall_timeout
+        if resource is not None:
+            command = [self.python, "-c", _BOOTSTRAP, str(self.cpu_limit), str(self.memory_mb * 1024 * 1024),
+                       str(self.file_size_mb * 1024 * 1024), filepath]
+        else:
+            command = [self.python, filepath]
+        start = time.time()
+        try:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                stdin=subprocess.DEVNULL,
+                text=True,
+                cwd=cwd,
+                start_new_session=True,
+            )
+        except Exception as e:
+            return {"status": "exception", "error": str(e)}
+
+        stdout, stderr = [], []
+        readers = [
+            threading.Thread(target=_read_all, args=(process.stdout, stdout), daemon=True),
+            threading.Thread(target=_read_all, args=(process.stderr, stderr), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+
+        timed_out = threading.Event()
+        reaped = threading.Lock()
+
+        def kill():
+            with reaped:
+                if process.returncode is None:
+                    timed_out.set()
+                    _kill_session(process)
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        if hasattr(os, "wait4"):
+            # wait4 reaps the child and hands back its own rusage in one call
+            _, status, usage = os.wait4(process.pid, 0)
+            with reaped:
+                process.returncode = os.waitstatus_to_exitcode(status)
+            cpu_time = round(usage.ru_utime + usage.ru_stime, 3)
+            peak_rss_kb = usage.ru_maxrss
+        else:
+            process.wait()
+            cpu_time, peak_rss_kb = None, None
+        timer.cancel()
+        # Anything the script left running in its session would hold our pipes open
+        _kill_session(process)
+        for reader in readers:
+            reader.join()
+
+        duration = round(time.time() - start, 2)
+        output = "".join(stdout)
+        error = "".join(stderr)
+        result = {
+            "output": output,
+            "error": error,
+            "returncode": process.returncode,
+            "duration": duration,
+            "cpu_time": cpu_time,
+            "peak_rss_kb": peak_rss_kb,
+        }
+        if timed_out.is_set():
+            result["status"] = "timeout"
+        elif process.returncode != 0:
+            result["status"] = "error"
+            if process.returncode == -getattr(signal, "SIGXCPU", 0):
+                result["reason"] = f"CPU limit of {self.cpu_limit}s exceeded"
+        else:
+            result["status"] = "success"
+        return result
+
+    def submit(self, filepath, timeout=None, cwd=None):
+        """Queues a run and returns a Future for its result dict."""
+        return self._pool.submit(self.run, filepath, timeout, cwd)
+
+    def run_many(self, filepaths, timeout=None, cwd=None) -> dict:
+        """Runs several files concurrently; returns {filepath: result}."""
+        futures = {path: self.submit(path, timeout, cwd) for path in filepaths}
+        return {path: future.result() for path, future in futures.items()}
+
+    def shutdown(self):
+        self._pool.shutdown()
+
+
+_sandbox = None
+_sandbox_lock = threading.Lock()
+
+
+def get_sandbox() -> Sandbox:
+    global _sandbox
+    with _sandbox_lock:
+        if _sandbox is None:
+            _sandbox = Sandbox()
+        return _sandbox
@@ -1,40 +1,40 @@
 # smart_result_handler.py
-import subprocess
-import os
-import json
-from controller import DeepSeekController # Make sure your controller is wired properly
-
-RESULT_LOG = "deepseek/memory/smart_result_memory.json"
+from sandbox import get_sandbox
+from memory.memory_store import get_store, canonical_key
+from repair_loop import repair_file, RESULT_LOG
 
 def load_result_memory():
-    if os.path.exists(RESULT_LOG):
-        with open(RESULT_LOG, "r") as f:
-            return json.load(f)
-    return {}
+    return get_store(RESULT_LOG)
 
 def save_result_memory(memory):
-    with open(RESULT_LOG, "w") as f:
-        json.dump(memory, f, indent=4)
+    memory.save()
+
+def format_results(result):
+    """Model reply as returned by the API: surrounding whitespace dropped."""
+    return (result or "").strip()
 
 def run_file_and_log(filepath: str):
     result_memory = load_result_memory()
-    normalized = os.path.normpath(filepath)
+    normalized = canonical_key(filepath)
     
     print(f"🚀 Running: {filepath}\n")
-    try:
-        output = subprocess.check_output(["python", filepath], stderr=subprocess.STDOUT, timeout=10)
-        output_text = output.decode("utf-8").strip()
+    result = get_sandbox().run(filepath, timeout=10)
+    if result["status"] == "success":
+        output_text = result["output"].strip()
 
         result_memory[normalized] = {
             "status": "success",
             "output": output_text,
             "attempts": result_memory.get(normalized, {}).get("attempts", 0) + 1,
-            "last_fixed": False
+            "last_fixed": False,
+            "duration": result["duration"],
+            "cpu_time": result["cpu_time"],
+            "peak_rss_kb": result["peak_rss_kb"]
         }
         print(f"✅ Execution success:\n{output_text}")
 
-    except subprocess.CalledProcessError as e:
-        error_text = e.output.decode("utf-8")
+    else:
+        error_text = (result.get("output", "") + result.get("error", "")) or result["status"]
         print(f"❌ Execution failed:\n{error_text}")
 
         result_memory[normalized] = {
@@ -47,11 +47,9 @@ def run_file_and_log(filepath: str):
         # Ask permission before auto-fix
         permission = input("🔧 Want me to fix it automatically? (y/n): ").strip().lower()
         if permission == 'y':
-            deepseek = DeepSeekController()
-            deepseek.update_file("Fix all bugs and errors.", filepath)
-            result_memory[normalized]["last_fixed"] = True
-            print("🔁 Retrying after fix...\n")
-            return run_file_and_log(filepath)
+            save_result_memory(result_memory)
+            print("🔁 Starting bounded fix-and-retry loop...\n")
+            return repair_file(filepath)
 
     save_result_memory(result_memory)
 